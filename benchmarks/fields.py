@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import Callable
+import bisect
+import timeit
+
+from cronus import Field
+
+# python -m benchmarks.fields
+# only the lookups of the first value beat lists for all fields. Testing the mask in place beats membership in
+# lists of many values only: lists of a few values (*/15, or a single one) are as fast or faster. `in` of a field
+# loses to both, for all but dense fields
+
+specs = {
+    'seconds *': list(range(60)),
+    'seconds */15': list(range(0, 60, 15)),
+    'seconds 0': [0],
+}
+probes = list(range(60)) * 10
+
+
+def measure(function: Callable[[], object], number: int = 200) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number / len(probes) * 1e9
+
+
+def list_contains(values: list[int]) -> Callable[[], object]:
+    return lambda: [probe in values for probe in probes]
+
+
+def field_contains(field: Field) -> Callable[[], object]:
+    return lambda: [probe in field for probe in probes]
+
+
+def mask_contains(field: Field) -> Callable[[], object]:
+    """testing the bit of the mask in place, as hot paths do (`in` costs a call of `Field.__contains__`). Not faster
+    than a short list"""
+    mask = field.mask
+    return lambda: [mask >> probe & 1 == 1 for probe in probes]
+
+
+def list_first(values: list[int]) -> Callable[[], object]:
+    def first(value: int) -> int | None:
+        i = bisect.bisect_left(values, value)
+        return values[i] if i < len(values) else None
+    return lambda: [first(probe) for probe in probes]
+
+
+def field_first(field: Field) -> Callable[[], object]:
+    return lambda: [field.first(probe) for probe in probes]
+
+
+def main() -> None:
+    print(f"{'field':<14}{'operation':<12}{'list, ns':>10}{'field, ns':>10}{'mask, ns':>10}")
+    for name, values in specs.items():
+        field = Field(values, 59)
+        print(f"{name:<14}{'contains':<12}{measure(list_contains(values)):>10.1f}"
+              f"{measure(field_contains(field)):>10.1f}{measure(mask_contains(field)):>10.1f}")
+        print(f"{name:<14}{'first':<12}{measure(list_first(values)):>10.1f}{measure(field_first(field)):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
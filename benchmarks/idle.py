@@ -0,0 +1,48 @@
+from __future__ import annotations
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+# python -m benchmarks.idle [seconds]
+# Linux only: context switches are read from /proc
+
+
+def context_switches(pid: int) -> int:
+    switches = 0
+    for status in glob.glob(f"/proc/{pid}/task/*/status"):
+        with open(status, 'r') as file:
+            for line in file:
+                if line.startswith(('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches')):
+                    switches += int(line.split()[1])
+    return switches
+
+
+def main(seconds: float = 60) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        crontab = os.path.join(directory, 'crontab')
+        with open(crontab, 'w') as file:
+            file.write('1 1 * 0 0 0 echo > /dev/null #2000-01-01 00:00:00\n')
+        cronus = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cronus.py')
+        daemon = subprocess.Popen((sys.executable, cronus, crontab))
+        try:
+            time.sleep(2)  # startup
+            process = psutil.Process(daemon.pid)
+            cpu_before = sum(process.cpu_times()[:2])
+            switches_before = context_switches(daemon.pid)
+            time.sleep(seconds)
+            cpu = sum(process.cpu_times()[:2]) - cpu_before
+            switches = context_switches(daemon.pid) - switches_before
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    hour = 3600 / seconds
+    print(f"idle for {seconds:.0f}s: cpu {cpu * hour:.3f}s per hour, {switches * hour:.0f} wakeups per hour")
+
+
+if __name__ == '__main__':
+    main(*map(float, sys.argv[1:]))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import gc
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from benchmarks.parsing import crontab
+from cronus import Clock, Crontab, Task
+
+# python -m benchmarks.memory
+
+
+def traced(function: Callable[[], object]) -> tuple[object, int]:
+    """result of the function, and the memory it holds (bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(size: int = 100_000) -> None:
+    lines = crontab(size)
+    clock = Clock()
+    for line in lines:  # fields are shared between tasks, and cached once
+        Task.from_string(line, clock)
+
+    # lines are held by the crontab anyway
+    tasks, tasks_size = traced(lambda: [task for line in lines if (task := Task.from_string(line, clock))])
+    print(f"tasks: {len(tasks)} in {tasks_size / 2 ** 20:.1f}MiB, {tasks_size / len(tasks):.0f}B per task")
+    del tasks
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'crontab')
+        with open(filename, 'w') as file:
+            file.writelines(lines)
+
+        def read() -> Crontab:
+            _crontab = Crontab(filename, clock)
+            _crontab.read()
+            return _crontab
+
+        _crontab, crontab_size = traced(read)
+        print(f"crontab: {size} lines in {crontab_size / 2 ** 20:.1f}MiB, {crontab_size / size:.0f}B per line")
+        del _crontab
+
+        def write() -> Crontab:
+            """tasks share the written lines with the crontab, as they did the read ones"""
+            _crontab = read()
+            for task in _crontab.tasks():
+                task.mark_called()
+            _crontab.write()
+            return _crontab
+
+        _crontab, written_size = traced(write)
+        print(f"written: {size} lines in {written_size / 2 ** 20:.1f}MiB, {written_size / size:.0f}B per line")
+
+
+if __name__ == '__main__':
+    main()
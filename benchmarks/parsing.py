@@ -0,0 +1,55 @@
+from __future__ import annotations
+import random
+import time
+
+from cronus import Clock, Field, Task, grammar
+
+# python -m benchmarks.parsing
+
+schedules = ('* * * * * *',
+             '* * * */5 0 0',
+             '* * *  *    */15    0',
+             '1-3 1-3 1-3 0 0 0',
+             '*/2 29 * 1 2 3',
+             '* * 5,6,7 * 0,3 0',
+             '\t* * *\t22   15    0')
+commands = ('echo > /dev/null',
+            'echo "a #b" >> /tmp/out',
+            "backup --to '/mnt/#1' --quiet")
+comments = ('',
+            ' # comment',
+            '#comment "abc"')
+last_calls = ('',
+              ' #1510869599',
+              ' #2017-11-16 23:59:59')
+
+
+def crontab(size: int, seed: int = 0, _schedules: tuple[str, ...] = schedules) -> list[str]:
+    _random = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        if _random.random() < 0.05:
+            lines.append('# ' + _random.choice(commands) + '\n')
+        else:
+            lines.append(' '.join((_random.choice(_schedules), _random.choice(commands)))
+                         + _random.choice(comments)
+                         + _random.choice(last_calls)
+                         + '\n')
+    return lines
+
+
+def main(size: int = 50_000) -> None:
+    lines = crontab(size)
+    clock = Clock()
+    for name, parse in (('grammar', grammar.match),
+                        ('Task.from_string', lambda line: Task.from_string(line, clock))):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        seconds = time.perf_counter() - start
+        print(f"{name}: {size} lines in {seconds:.3f}s, {seconds / size * 1e6:.1f}us per line")
+    print(Field.from_string.cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+import statistics
+import time
+
+from cronus import Clock, Task
+
+# python -m benchmarks.spawning
+
+# the same program (not a builtin of the shell), but `;` makes the command go through the shell
+commands = {'shell': 'sleep 0;',
+            'direct': 'sleep 0'}
+
+
+def main(size: int = 100, rounds: int = 5) -> None:
+    clock = Clock()
+    print(f"{'command':<10}{'spawn (median), us':>20}{'spawn+exit (median), us':>25}")
+    for name, command in commands.items():
+        tasks = [Task.from_string('* * * * * * ' + command, clock) for _ in range(size)]
+        spawn_seconds = []
+        total_seconds = []
+        for task in tasks * rounds:  # as if they fired every second
+            start = time.perf_counter()
+            process = task.spawn()
+            spawn_seconds.append(time.perf_counter() - start)
+            process.wait()
+            total_seconds.append(time.perf_counter() - start)
+        print(f"{name:<10}{statistics.median(spawn_seconds) * 1e6:>20.0f}"
+              f"{statistics.median(total_seconds) * 1e6:>25.0f}")
+
+
+if __name__ == '__main__':
+    main()
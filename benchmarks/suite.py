@@ -0,0 +1,208 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.parsing import crontab
+from cronus import BatchEvaluator, Crontab, Scheduler, SimulatedClock, Task
+
+# python -m benchmarks.suite [--sizes 10 1000] [--runs 3] [--output results.json] [--baseline benchmarks/baseline.json]
+# results are seconds per operation (the median over runs of the best of repeats). The baseline holds the timings of
+# the machine it was saved on: re-save it (--save-baseline) before comparing on another one. Results under a
+# millisecond are compared with a wider tolerance, since a busy moment of the machine doubles them easily
+
+densities = {
+    'dense': ('* * * * * *',
+              '* * * * * */5',
+              '* * * * */1 0',
+              '* * * * * 0,30'),
+    'sparse': ('* * * 3 15 0',
+               '1 1 * 0 0 0',
+               '* * 7 12 0 0',
+               '*/3 1 * 6 30 0',
+               '* * 1-5 9 0 0'),
+}
+now = datetime(2021, 3, 7, 22, 50, 30)
+fine_seconds = 1e-3  # results below are compared with the fine tolerance
+calls_per_task = 10
+sample_size = 1000  # of tasks, for the slower per-task operations
+fired_tasks = 10_000  # to pop and reschedule (per fired task)
+
+
+def measure(function: Callable[[], object], operations: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best / operations
+
+
+def run(size: int, density: str) -> dict[str, float]:
+    clock = SimulatedClock(now)
+    lines = crontab(size, 0, densities[density])
+    repeat = max(1, min(50, 5000 // size))  # more for smaller crontabs, which are noisier
+    results = {}
+
+    results['from_string'] = measure(lambda: [Task.from_string(line, clock) for line in lines], size, repeat)
+    tasks = [task for line in lines if (task := Task.from_string(line, clock))]
+    sample = tasks[:sample_size]
+
+    results['calls'] = measure(lambda: [list(islice(task.calls(now), calls_per_task)) for task in sample],
+                               len(sample) * calls_per_task,
+                               repeat)
+    results['skipped'] = measure(lambda: [task.skipped() for task in sample], len(sample), repeat)
+    results['batch_skipped'] = measure(lambda: BatchEvaluator(tasks).missed_calls(now), len(tasks), repeat)
+
+    def schedule() -> Scheduler:
+        scheduler = Scheduler()
+        for task in tasks:
+            scheduler.add(task, now)
+        return scheduler
+
+    def fire() -> None:
+        scheduler = schedule()
+        fired = 0
+        start = time.perf_counter()
+        while fired < fired_tasks:
+            event = scheduler.pop_event()
+            scheduler.reschedule(event)
+            fired += len(event.tasks)
+        fire_seconds.append((time.perf_counter() - start) / fired)
+
+    results['schedule'] = measure(schedule, len(tasks), repeat)
+    results['batch_schedule'] = measure(lambda: Scheduler().add_all(tasks, now), len(tasks), repeat)
+    fire_seconds: list[float] = []
+    for _ in range(repeat):
+        fire()
+    results['next_events'] = min(fire_seconds)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'crontab')
+
+        def reset() -> None:
+            with open(filename, 'w') as file:
+                file.writelines(lines)
+
+        def read() -> Crontab:
+            _crontab = Crontab(filename, clock)
+            _crontab.read()
+            return _crontab
+
+        def reload() -> None:
+            reset()
+            _crontab = read()
+            changed_lines = lines[:]
+            for line_id in range(0, size, 100):  # 1% of lines
+                changed_lines[line_id] = '* * * * * * echo changed ' + str(line_id) + '\n'
+            with open(filename, 'w') as file:
+                file.writelines(changed_lines)
+            start = time.perf_counter()
+            _crontab.read()
+            reload_seconds.append(time.perf_counter() - start)
+
+        def write() -> None:
+            reset()
+            _crontab = read()
+            for task in _crontab.tasks():
+                task.update_last_call(now + timedelta(seconds=1))
+            start = time.perf_counter()
+            _crontab.write()
+            write_seconds.append(time.perf_counter() - start)
+
+        reset()
+        results['read'] = measure(read, 1, repeat)
+        reload_seconds: list[float] = []
+        write_seconds: list[float] = []
+        for _ in range(repeat):
+            reload()
+            write()
+        results['reload'] = min(reload_seconds)
+        results['write'] = min(write_seconds)
+    return results
+
+
+def calibrate() -> float:
+    """time of a fixed workload, to take the speed of the machine at the moment into account"""
+    return measure(lambda: sorted(str(i) for i in range(100_000)), 1, 10)
+
+
+def compare(results: dict[str, float],
+            baseline: dict[str, float],
+            speed: float,
+            tolerance: float,
+            fine_tolerance: float) -> list[str]:
+    """
+    names of results slower than in the baseline more than `tolerance` times (`speed` times the machine), or
+    `fine_tolerance` times for results under `fine_seconds`
+    """
+    regressions = []
+    print(f"{'benchmark':<32}{'baseline, us':>14}{'now, us':>12}{'ratio':>8}")
+    for name, seconds in results.items():
+        if name in baseline:
+            ratio = seconds / baseline[name] / speed
+            is_regression = ratio > (tolerance if baseline[name] >= fine_seconds else fine_tolerance)
+            mark = '  REGRESSION' if is_regression else ''
+            print(f"{name:<32}{baseline[name] * 1e6:>14.2f}{seconds * 1e6:>12.2f}{ratio:>8.2f}{mark}")
+            if is_regression:
+                regressions.append(name)
+    return regressions
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of parsing, scheduling, reloading and writing')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100_000], help='lines of crontabs')
+    parser.add_argument('--runs', type=int, default=3, help='of the whole suite, whose median results are kept')
+    parser.add_argument('--output', help='where to write results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results into the baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='slowdown, regarded as a regression')
+    parser.add_argument('--fine-tolerance', type=float, default=3, help='slowdown of results under a millisecond')
+    arguments = parser.parse_args(arguments)
+
+    calibration = calibrate()
+    runs: dict[str, list[float]] = {}
+    for _ in range(arguments.runs):
+        for size in arguments.sizes:
+            for density in densities:
+                for name, seconds in run(size, density).items():
+                    runs.setdefault(f"{name}/{size}/{density}", []).append(seconds)
+                    print(f"{name}/{size}/{density}: {seconds * 1e6:.2f}us", file=sys.stderr)
+        calibration = min(calibration, calibrate())
+    results = {name: statistics.median(seconds) for name, seconds in runs.items()}
+    report = {'python': platform.python_version(),
+              'machine': platform.machine(),
+              'calibration': calibration,
+              'results': results}
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    if arguments.baseline and arguments.save_baseline:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(report, file, indent=1)
+    elif arguments.baseline:
+        with open(arguments.baseline, 'r') as file:
+            baseline = json.load(file)
+        speed = calibration / baseline['calibration']
+        if regressions := compare(results,
+                                  baseline['results'],
+                                  speed,
+                                  arguments.tolerance,
+                                  arguments.fine_tolerance):
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            return 1
+    elif not arguments.output:
+        json.dump(report, sys.stdout, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
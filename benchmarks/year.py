@@ -0,0 +1,34 @@
+from __future__ import annotations
+from datetime import datetime
+import time
+
+from cronus import Clock, Task
+
+# python -m benchmarks.year
+
+schedules = {'every minute': '* * * * * 0',
+             'every 15 minutes': '* * * * */15 0',
+             'hourly': '* * * * 0 0',
+             'weekdays at 9': '* * 1-5 9 0 0',
+             'sundays at 12': '* * 7 12 0 0',
+             'friday 13th': '* 13 5 0 0 0',
+             'leap day': '2 29 * 0 0 0'}
+_from = datetime(2024, 1, 1)
+_to = datetime(2025, 1, 1)
+
+
+def main(repeat: int = 5) -> None:
+    clock = Clock()
+    print(f"{'schedule':<20}{'calls':>8}{'ms':>10}{'us per call':>14}")
+    for name, schedule in schedules.items():
+        task = Task.from_string(schedule + ' true #0', clock)  # called long ago
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            calls = list(task.calls(_from, _to))
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<20}{len(calls):>8}{best * 1e3:>10.2f}{best / max(len(calls), 1) * 1e6:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
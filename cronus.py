@@ -1,15 +1,41 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import Union, IO, Optional
+from datetime import date, datetime, timedelta, MAXYEAR, MINYEAR
+from typing import Callable, Collection, Union, Iterable, Iterator, Optional, TextIO
+import abc
+import argparse
+import asyncio
+import bisect
 import calendar
+import collections
+import concurrent.futures
+import contextlib
+import ctypes
+import errno
+import functools
+import hashlib
+import heapq
+import itertools
+import math
 import os
 import platform
 import psutil
-import queue
+import random
 import re
+import select
+import shlex
+import shutil
+import signal
+import struct
 import subprocess
 import sys
-import threading
+import tempfile
+import time
+import urllib.parse
+
+try:
+    import numpy  # optional: searches days of many schedules at once
+except ImportError:
+    numpy = None
 
 # todo: allow manual decrease of last_call
 # todo: better track/check file change (akelpad)
@@ -31,13 +57,27 @@ import threading
 sep = '[ \\t]'
 nr1 = '(?:\\*|\\*/\\d+|\\d+|\\d+-\\d+)'
 nr = '(' + nr1 + '(?:,' + nr1 + ')*' + ')'
-command = '(?:\'[^\']*\'|"[^"]*"|[^#\'"]+)+'
+# a run of blanks belongs to the command only if the command continues after it
+command = '(?:\'[^\']*\'|"[^"]*"|[^#\'" \\t\\n]|' + sep + '+(?![ \\t#]))+'
 last_call = ' #(\\d+|\\d{4}-\\d{2}-\\d{2} \\d{2}:\\d{2}:\\d{2})'
 end = '\\n?$'
-# comment = '#(?:(?!' + last_call + end + ').)*'
 comment = '#.*'
 beginning = '^' + sep + '*'
-pattern = beginning + (nr + sep + '+') * 6 + '(' + command + ')' + '(' + comment + ')?' + end
+# groups: task definition (line without last call), 6 fields, command, comment, last call. No groups for empty lines
+grammar = re.compile('^(?:' + sep + '*(?:' + comment + ')?|('
+                     + sep + '*' + (nr + sep + '+') * 6 + '(' + command + ')(?:' + sep + '*(#.*?))??' + sep + '*)'
+                     + '(?:' + last_call + ')?)' + end)
+range_pattern = re.compile('(\\d+)-(\\d+)')
+crontab_name_pattern = re.compile('^[A-Za-z0-9_-]+$')  # of files in directories of crontabs, as in cron.d
+# trailing annotations in the comment of a task: "# nightly report @priority=-1 @max-delay=600"
+annotation_pattern = re.compile('(?:^|' + sep + ')@(priority|max-delay)=(-?\\d+)(?=' + sep + '|$)')
+# commands with none of these are run without a shell (quoting is the same for shlex). Braces are expanded by bash,
+# which /bin/sh is on some systems
+shell_characters = re.compile('[|&;<>()$`\\\\*?\\[{}#~\\n]')
+# builtins and keywords: `time` of bash is not /usr/bin/time
+shell_words = frozenset(('!', '.', ':', '{', 'alias', 'break', 'case', 'cd', 'continue', 'eval', 'exec', 'exit',
+                         'export', 'for', 'if', 'read', 'readonly', 'return', 'set', 'shift', 'source', 'time',
+                         'times', 'trap', 'ulimit', 'umask', 'unset', 'until', 'wait', 'while'))
 
 
 def alert(error: str | BaseException) -> None:
@@ -50,178 +90,160 @@ def alert(error: str | BaseException) -> None:
     subprocess.call(f"alert \"{Cronus.__name__}: {error}\"", shell=True)
 
 
+def split_command(command: str) -> Optional[list[str]]:
+    """arguments to execute the command with, if it needs no shell"""
+    if shell_characters.search(command):
+        return None
+    try:
+        arguments = shlex.split(command)
+    except ValueError:  # unbalanced quotes
+        return None
+    if not arguments or arguments[0] in shell_words or '=' in arguments[0]:  # variable assignment
+        return None
+    return arguments
+
+
+async def terminate_async(process: asyncio.subprocess.Process) -> None:
+    # commands lead their own process groups. Members, still there after the leader exited, are killed at once
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGTERM)
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(process.wait(), Supervisor.kill_after_seconds)
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
 class Clock:
     def time(self) -> datetime:
         return datetime.now()
 
 
+class SimulationFinished(Exception):
+    pass
+
+
+class SimulatedClock(Clock):
+    """
+    Time, that passes only by sleeping, and instantly. Runs out at `_to`
+    """
+
+    def __init__(self, _from: datetime, _to: Optional[datetime] = None) -> None:
+        self.__time = _from
+        self.__to = _to
+
+    def time(self) -> datetime:
+        return self.__time
+
+    def sleep(self, until: datetime) -> None:
+        if self.__to and until >= self.__to:
+            raise SimulationFinished
+        self.__time = max(self.__time, until)
+
+
+day_seconds = 24 * 60 * 60
+
+
+@functools.lru_cache(maxsize=None)
+def month_calendar(year: int) -> tuple[tuple[int, int], ...]:
+    """numbers of days and ISO weekdays of first days of months of the year (by months, 1-12)"""
+    return ((0, 0),) + tuple((calendar.monthrange(year, month)[1], calendar.weekday(year, month, 1) + 1)
+                             for month in range(1, 13))
+
+
+@functools.lru_cache(maxsize=4096)
+def weekday_days(weekdays: int, first_weekday: int, days_in_month: int) -> int:
+    """bitmask of days of a month, that fall on the weekdays (a bitmask of ISO weekdays)"""
+    days = 0
+    for day in range(1, days_in_month + 1):
+        weekday = (first_weekday + day - 2) % 7 + 1
+        if weekdays >> weekday & 1:
+            days |= 1 << day
+    return days
+
+
 last_call_fmt_timestamp = 1
 last_call_fmt_datetime = 2
 
 
 class LastCall:
-    def __init__(self, _datetime: datetime, _format: int) -> None:
-        self.datetime = _datetime
+    __slots__ = ('timestamp', 'format')
+
+    def __init__(self, timestamp: int, _format: int) -> None:
+        self.timestamp = timestamp
         self.format = _format
 
     @staticmethod
-    def from_string(string: str) -> LastCall | None:
-        if _last_call := re.search("^.+" + last_call + end, string):
-            _last_call = _last_call.group(1)
-            if _last_call.isdigit():
-                return LastCall(datetime.fromtimestamp(int(_last_call)), last_call_fmt_timestamp)
-            else:
-                return LastCall(datetime.strptime(_last_call, "%Y-%m-%d %H:%M:%S"), last_call_fmt_datetime)
-        return None
+    def from_value(value: str) -> LastCall:
+        if value.isdigit():
+            return LastCall(int(value), last_call_fmt_timestamp)
+        else:
+            return LastCall(int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()), last_call_fmt_datetime)
 
     def __str__(self) -> str:
         if self.format == last_call_fmt_timestamp:
-            return str(int(self.datetime.timestamp()))
+            return str(self.timestamp)
         elif self.format == last_call_fmt_datetime:
-            return self.datetime.strftime("%Y-%m-%d %H:%M:%S")
+            return datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S")
         else:
             raise Exception(f"Unknown format: {self.format}")
 
-    def is_less(self, other: LastCall) -> bool:
-        return self.datetime.timestamp() < other.datetime.timestamp()
 
-
-class Task:
-    __process: Union[subprocess.Popen, None] = None
-
-    def __init__(self,
-                 original_string: str,
-                 months: str,
-                 days: str,
-                 weekdays: str,
-                 hours: str,
-                 minutes: str,
-                 seconds: str,
-                 _command: str,
-                 _last_call: LastCall,
-                 clock: Clock) -> None:
-        self.__original_string = original_string
-        self.__months = self.__values(months, 1, 12)
-        self.__days = self.__values(days, 1, 31)
-        self.__weekdays = self.__values(weekdays, 1, 7)
-        if 7 in self.__weekdays:
-            self.__weekdays.remove(7)
-            self.__weekdays.insert(0, 0)
-        self.__hours = self.__values(hours, 0, 23)
-        self.__minutes = self.__values(minutes, 0, 59)
-        self.__seconds = self.__values(seconds, 0, 59)
-        self.__command = _command
-        self.__last_call = _last_call
-        self.__clock = clock
-        self.__creation_time = clock.time()
-        self.__expected_last_call(datetime(3000, 1, 1))  # todo: check if it may ever be called
-
-    def __del__(self) -> None:
-        if process := self.__get_running_process():
-            # process.terminate()
-            # process.wait(5)
-
-            # try:
-            #     os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-            # except ProcessLookupError:
-            #     pass
-            # process.wait(5)
-
-            try:
-                parent = psutil.Process(process.pid)
-                children = parent.children(recursive=True)
-
-                for child in children:
-                    try:
-                        child.terminate()
-                    except psutil.NoSuchProcess:
-                        pass
-                parent.terminate()
-
-                gone, alive = psutil.wait_procs(children + [parent], timeout=5)
-
-                for p in alive:
-                    try:
-                        p.kill()
-                    except psutil.NoSuchProcess:
-                        pass
-            except psutil.NoSuchProcess:
-                pass
+class Field:
+    """
+    Allowed values of a schedule field: a bitmask, plus lookup tables of the nearest allowed value.
+    Instances are shared between tasks (see `from_string`), and must not be modified. `in` is no faster than with
+    a list of the values (hot paths test the mask in place instead)
+    """
+    __slots__ = ('mask', '__next', '__prev')
+
+    def __init__(self, values: Iterable[int], _max: int) -> None:
+        mask = 0
+        for value in values:
+            mask |= 1 << value
+        _next: list[Optional[int]] = [None] * (_max + 2)
+        _prev: list[Optional[int]] = [None] * (_max + 2)
+        for value in range(_max, -1, -1):
+            _next[value] = value if mask >> value & 1 else _next[value + 1]
+        for value in range(_max + 1):
+            _prev[value + 1] = value if mask >> value & 1 else _prev[value]
+        self.mask = mask
+        self.__next = tuple(_next)
+        self.__prev = tuple(_prev)
 
     @staticmethod
-    def from_string(string: str, clock: Clock) -> Union[Task, None]:
-        global pattern, beginning, comment, last_call, end
+    @functools.lru_cache(maxsize=4096)
+    def from_string(value: str, _min: int, _max: int) -> Field:
+        # hits and misses: Field.from_string.cache_info()
+        values = set(Field.__calc_values(value, _min, _max))
+        for v in values:
+            if not _min <= v <= _max:
+                raise Exception
+        return Field(values, _max)
 
-        if re.match(beginning + comment, string) or re.match(beginning + end, string):
-            return None
-        task = re.search(pattern, string)
-        if not task:
-            raise Exception('Wrong format for task: ' + string)
-        groups = task.groups()
-        last_call_idx = 7
-        if len(groups) != last_call_idx + 1:
-            raise Exception('Task parsed incorrectly')
-        _last_call = LastCall.from_string(string) or LastCall(clock.time(), last_call_fmt_datetime)
-        string = re.match('^((?:(?!' + last_call + ').)*)(?:' + last_call + ')?' + end, string).group(1)
-        # noinspection PyTypeChecker
-        return Task(*([string] + [group.strip() for group in list(groups[:-1])] + [_last_call, clock]))
+    def __contains__(self, value: int) -> bool:
+        return self.mask >> value & 1 == 1
 
-    def __str__(self) -> str:
-        return self.__original_string + ' #' + str(self.__last_call)
+    def __iter__(self) -> Iterator[int]:
+        mask = self.mask
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
 
-    def skipped(self) -> bool:
-        __last_call = self.__last_call.datetime if self.__last_call else self.__creation_time
-        return __last_call < self.__expected_last_call()
+    def __len__(self) -> int:
+        return self.mask.bit_count()
 
-    def calls(self, _from: datetime, _to: datetime) -> list[datetime]:
-        _calls = []
-        _from = max(_from, self.__last_call.datetime + timedelta(microseconds=1)) if self.__last_call else _from
-        year = self.__year_start(_from)
-        while True:
-            for month in self.__months:  # todo: refactor
-                __time = year.replace(month=month)
-                if self.__add_month(__time) >= _from:
-                    for day in self.__days:
-                        if self.__is_correct_date(__time, day=day):
-                            __time = __time.replace(day=day)
-                            if __time + timedelta(days=1) >= _from:
-                                for weekday in self.__weekdays:
-                                    if self.__is_correct_date(__time, weekday=weekday):
-                                        for hour in self.__hours:
-                                            __time = __time.replace(hour=hour)
-                                            if __time + timedelta(hours=1) >= _from:
-                                                for minute in self.__minutes:
-                                                    __time = __time.replace(minute=minute)
-                                                    if __time + timedelta(minutes=1) >= _from:
-                                                        for second in self.__seconds:
-                                                            __time = __time.replace(second=second)
-                                                            if __time >= _to:
-                                                                return _calls
-                                                            if __time >= _from:
-                                                                _calls.append(__time)
-            year = year.replace(year=year.year + 1)
-            if year > _to:
-                return _calls
-
-    def execute(self) -> None:
-        if self.__get_running_process():
-            return
-        self.__run()
-        self.__set_last_call(self.__clock.time())
+    def count_below(self, value: int) -> int:
+        """number of allowed values, less than `value`"""
+        return (self.mask & ((1 << value) - 1)).bit_count()
 
-    def equals(self, other: Task) -> bool:  # todo: cover with test
-        return self.__original_string == other.__original_string
+    def first(self, value: int) -> Optional[int]:
+        """smallest allowed value, not less than `value`"""
+        return self.__next[value]
 
-    def copy_last_call(self, other: Task) -> None:
-        if self.__last_call.is_less(other.__last_call):
-            self.__set_last_call(other.__last_call.datetime)
-
-    def __values(self, value: str, _min: int, _max: int) -> list[int]:
-        values = sorted(list(set(self.__calc_values(value, _min, _max))))
-        for v in values:
-            if not _min <= v <= _max:
-                raise Exception
-        return values
+    def last(self, value: int) -> Optional[int]:
+        """largest allowed value, not greater than `value`"""
+        return self.__prev[value + 1]
 
     @staticmethod
     def __calc_values(value: str, _min: int, _max: int) -> list[int]:
@@ -235,7 +257,7 @@ class Task:
                     values += list(_range)
                 elif value[:2] == '*/':
                     values += [v for v in _range if v % int(value[2:]) == 0]
-                elif match := re.search('(\\d+)-(\\d+)', value):
+                elif match := range_pattern.search(value):
                     value = [int(v) for v in match.groups()]
                     if value[1] <= value[0]:
                         raise Exception('Incorrect bounds')
@@ -244,76 +266,306 @@ class Task:
                     raise Exception('Unknown format')
         return values
 
-    def __expected_last_call(self, now: Optional[datetime] = None) -> datetime:
-        if not now:
-            now = self.__clock.time()
-        years = 0
-        year = self.__year_start(now)
-        while True:
-            for month in reversed(self.__months):  # todo: refactor
-                __time = year.replace(month=month)
-                if __time <= now:
-                    for day in reversed(self.__days):
-                        if self.__is_correct_date(__time, day=day):
-                            __time = __time.replace(day=day)
-                            if __time <= now:
-                                for weekday in reversed(self.__weekdays):
-                                    if self.__is_correct_date(__time, weekday=weekday):
-                                        for hour in reversed(self.__hours):
-                                            __time = __time.replace(hour=hour)
-                                            if __time <= now:
-                                                for minute in reversed(self.__minutes):
-                                                    __time = __time.replace(minute=minute)
-                                                    if __time <= now:
-                                                        for second in reversed(self.__seconds):
-                                                            __time = __time.replace(second=second)
-                                                            if now > __time:
-                                                                return __time
-            year = year.replace(year=year.year - 1)
-            years += 1
-            if years > 28:
-                raise Exception('Task is never to be executed: ' + self.__original_string)
-
-    def __run(self) -> None:
-        try:
-            self.__process = subprocess.Popen(self.__command, shell=True)
-            # self.__process = subprocess.Popen(self.__command, env=os.environ)
-        except Exception as exception:
-            alert(exception)
 
-    def __set_last_call(self, _datetime: datetime) -> None:
-        self.__last_call.datetime = _datetime
+class Task:
+    """
+    Kept compact, as crontabs may be large: the definition and the command are slices of the line of the crontab
+    (taken when needed), fields are shared, the last call is a timestamp
+    """
+    __slots__ = ('__line', '__definition_end', '__command_start', '__command_end',
+                 '__months', '__days', '__weekdays', '__hours', '__minutes', '__seconds',
+                 '__last_call', '__last_call_format', '__clock', '__priority', '__max_delay_seconds',
+                 '__program', '__arguments', '__needs_shell')
 
-    def __get_running_process(self) -> Union[subprocess.Popen, None]:
-        if self.__process and self.__process.poll() is not None:
-            self.__process = None
-        return self.__process
+    def __init__(self,
+                 line: str,
+                 definition_end: int,
+                 months: str,
+                 days: str,
+                 weekdays: str,
+                 hours: str,
+                 minutes: str,
+                 seconds: str,
+                 command_span: tuple[int, int],
+                 _last_call: LastCall,
+                 clock: Clock,
+                 priority: int = 0,
+                 max_delay_seconds: Optional[float] = None) -> None:
+        self.__program: Optional[str] = None  # to run the command with, if it needs no shell
+        self.__arguments: Optional[list[str]] = None
+        self.__needs_shell = False
+        self.__line = line
+        self.__definition_end = definition_end
+        self.__command_start, self.__command_end = command_span
+        self.__months = Field.from_string(months, 1, 12)
+        self.__days = Field.from_string(days, 1, 31)
+        self.__weekdays = Field.from_string(weekdays, 1, 7)  # ISO weekdays, 7 is sunday
+        self.__hours = Field.from_string(hours, 0, 23)
+        self.__minutes = Field.from_string(minutes, 0, 59)
+        self.__seconds = Field.from_string(seconds, 0, 59)
+        self.__last_call = _last_call.timestamp
+        self.__last_call_format = _last_call.format
+        self.__clock = clock
+        self.__priority = priority
+        self.__max_delay_seconds = max_delay_seconds
+        if not self.__is_satisfiable():
+            raise Exception('Task is never to be executed: ' + self.definition())
 
     @staticmethod
-    def __year_start(base: datetime) -> datetime:
-        return base.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    def from_string(string: str, clock: Clock) -> Union[Task, None]:
+        spec = Task.parse(string)
+        return Task.from_spec(string, spec, clock) if spec else None
 
     @staticmethod
-    def __add_month(base: datetime) -> datetime:
-        month = base.month
-        year = base.year
-        month += 1
-        if month == 13:
-            year += 1
-            month = 1
-        return base.replace(year=year, month=month)
+    def parse(string: str) -> Optional[tuple]:
+        """arguments of the task of the line, but the line itself and the clock, as a flat tuple (see `from_spec`):
+        compact to pickle, as fields are interned. None for lines without tasks"""
+        task = grammar.match(string)
+        if not task:
+            raise Exception('Wrong format for task: ' + string)
+        definition, *fields, _command, _comment, _last_call = task.groups()
+        if definition is None:
+            return None
+        _last_call = LastCall.from_value(_last_call) if _last_call else None  # unless called, the task is new
+        annotations = dict(annotation_pattern.findall(_comment[1:])) if _comment else {}
+        command_start = task.start(8)
+        return (task.end(1),
+                *map(sys.intern, fields),
+                command_start,
+                command_start + len(_command.rstrip()),
+                _last_call.timestamp if _last_call else None,
+                _last_call.format if _last_call else None,
+                int(annotations.get('priority', 0)),
+                float(annotations['max-delay']) if 'max-delay' in annotations else None)
 
     @staticmethod
-    def __is_correct_date(base: datetime,
-                          day: Optional[int] = None,
-                          weekday: Optional[int] = None) -> bool:
-        if day is not None:
-            if day > calendar.monthrange(base.year, base.month)[1]:
-                return False
-            base = base.replace(day=day)
-        if weekday is not None and weekday != int(base.strftime('%w')):
+    def from_spec(string: str, spec: tuple, clock: Clock) -> Task:
+        definition_end, *fields, command_start, command_end, timestamp, _format, priority, max_delay_seconds = spec
+        return Task(string,
+                    definition_end,
+                    *fields,
+                    (command_start, command_end),
+                    LastCall(timestamp, _format) if timestamp is not None
+                    else LastCall(int(clock.time().timestamp()), last_call_fmt_datetime),
+                    clock,
+                    priority,
+                    max_delay_seconds)
+
+    def __str__(self) -> str:
+        return self.definition() + ' #' + str(LastCall(self.__last_call, self.__last_call_format))
+
+    def skipped(self) -> bool:
+        return self.missed_call() is not None
+
+    def missed_call(self) -> Optional[datetime]:
+        """latest scheduled time, when the task was not called"""
+        if (_call := self.prev_call(self.__clock.time())) and self.__last_call < _call.timestamp():
+            return _call
+        return None
+
+    def calls(self, _from: datetime, _to: Optional[datetime] = None) -> Iterator[datetime]:
+        after = max(_from - timedelta(microseconds=1), self.last_call())
+        year, month, day = after.year, after.month, after.day
+        second_of_day = after.hour * 3600 + after.minute * 60 + after.second + 1
+        while _call := self.__next(year, month, day, second_of_day):
+            year, month, day, second_of_day = _call
+            while second_of_day is not None:  # the rest of the day
+                hour, second = divmod(second_of_day, 3600)
+                minute, second = divmod(second, 60)
+                _call = datetime(year, month, day, hour, minute, second)
+                if _to is not None and _call >= _to:
+                    return
+                yield _call
+                second_of_day = self.__first_second(second_of_day + 1)
+            day, second_of_day = day + 1, 0
+
+    def next_call(self, after: datetime) -> Optional[datetime]:
+        """earliest scheduled time later than `after`"""
+        second_of_day = after.hour * 3600 + after.minute * 60 + after.second + 1
+        if _call := self.__next(after.year, after.month, after.day, second_of_day):
+            year, month, day, second_of_day = _call
+            hour, second = divmod(second_of_day, 3600)
+            minute, second = divmod(second, 60)
+            return datetime(year, month, day, hour, minute, second)
+        return None
+
+    def prev_call(self, before: datetime) -> Optional[datetime]:
+        """latest scheduled time earlier than `before`"""
+        second_of_day = before.hour * 3600 + before.minute * 60 + before.second - (before.microsecond == 0)
+        if _call := self.__prev(before.year, before.month, before.day, second_of_day):
+            year, month, day, second_of_day = _call
+            hour, second = divmod(second_of_day, 3600)
+            minute, second = divmod(second, 60)
+            return datetime(year, month, day, hour, minute, second)
+        return None
+
+    def spawn(self) -> Optional[subprocess.Popen]:
+        """the command leads its own process group, to be terminated as a whole. The shell runs it, if needed"""
+        try:
+            if program := self.__find_program():
+                try:
+                    return subprocess.Popen(self.__arguments, executable=program, start_new_session=True)
+                except (FileNotFoundError, PermissionError):  # left to the shell, to report
+                    self.__needs_shell = True
+            return subprocess.Popen(self.__get_command(), shell=True, start_new_session=True)
+            # return subprocess.Popen(self.__get_command(), env=os.environ)
+        except Exception as exception:
+            alert(exception)
+            return None
+
+    async def spawn_async(self) -> Optional[asyncio.subprocess.Process]:
+        try:
+            if program := self.__find_program():
+                try:
+                    return await asyncio.create_subprocess_exec(*self.__arguments,
+                                                                executable=program,
+                                                                start_new_session=True)
+                except (FileNotFoundError, PermissionError):
+                    self.__needs_shell = True
+            return await asyncio.create_subprocess_shell(self.__get_command(), start_new_session=True)
+        except Exception as exception:
+            alert(exception)
+            return None
+
+    def mark_called(self) -> None:
+        self.__last_call = int(self.__clock.time().timestamp())
+
+    def definition(self) -> str:
+        return self.__line[:self.__definition_end]
+
+    def rebind(self, line: str) -> None:
+        """to a line of the same definition (its last call may differ), so that the task shares it with the crontab"""
+        self.__line = line
+
+    def priority(self) -> int:
+        return self.__priority
+
+    def max_delay_seconds(self) -> Optional[float]:
+        """for how long the task may be deferred on a saturated host, if set"""
+        return self.__max_delay_seconds
+
+    def schedule(self) -> tuple[Field, Field, Field, Field, Field, Field]:
+        """months, days, weekdays, hours, minutes, seconds"""
+        return self.__months, self.__days, self.__weekdays, self.__hours, self.__minutes, self.__seconds
+
+    def copy_last_call(self, other: Task) -> None:
+        self.__last_call = max(self.__last_call, other.__last_call)
+
+    def last_call(self) -> datetime:
+        return datetime.fromtimestamp(self.__last_call)
+
+    def update_last_call(self, _datetime: datetime) -> None:
+        self.__last_call = max(self.__last_call, int(_datetime.timestamp()))
+
+    def __is_satisfiable(self) -> bool:
+        fields = (self.__months, self.__days, self.__weekdays, self.__hours, self.__minutes, self.__seconds)
+        if not all(field.mask for field in fields):
             return False
-        return True
+        # any existing date falls on every weekday within 28 years, so checking dates is enough
+        first_day = self.__days.first(1)
+        return any(first_day <= month_calendar(2000)[month][0] for month in self.__months)
+
+    def __get_command(self) -> str:
+        return self.__line[self.__command_start:self.__command_end]
+
+    def __find_program(self) -> Optional[str]:
+        # searched in PATH once. Commands not found there are left to the shell (functions, builtins, errors)
+        if not self.__program and not self.__needs_shell:
+            if (arguments := split_command(self.__get_command())) and (program := shutil.which(arguments[0])):
+                self.__program = program
+                self.__arguments = arguments
+            else:
+                self.__needs_shell = True
+        return None if self.__needs_shell else self.__program
+
+    def __next(self, year: int, month: int, day: int, second_of_day: int) -> Optional[tuple[int, int, int, int]]:
+        """earliest scheduled (year, month, day, second of day), not earlier than the given one. Values past the end
+        of a day or a month are allowed"""
+        while year <= MAXYEAR:
+            if (_month := self.__months.first(month)) is None:
+                year, month, day, second_of_day = year + 1, 1, 1, 0
+                continue
+            if _month != month:
+                month, day, second_of_day = _month, 1, 0
+            if (_day := self.__first_day(year, month, day)) is None:
+                month, day, second_of_day = month + 1, 1, 0
+                continue
+            if _day != day:
+                day, second_of_day = _day, 0
+            if (_second_of_day := self.__first_second(second_of_day)) is None:
+                day, second_of_day = day + 1, 0
+                continue
+            return year, month, day, _second_of_day
+        return None
+
+    def __prev(self, year: int, month: int, day: int, second_of_day: int) -> Optional[tuple[int, int, int, int]]:
+        """latest scheduled (year, month, day, second of day), not later than the given one. Values before the start
+        of a day or a month are allowed"""
+        while year >= MINYEAR:
+            if (_month := self.__months.last(month)) is None:
+                year, month, day, second_of_day = year - 1, 12, 31, day_seconds - 1
+                continue
+            if _month != month:
+                month, day, second_of_day = _month, 31, day_seconds - 1
+            if (_day := self.__last_day(year, month, day)) is None:
+                month, day, second_of_day = month - 1, 31, day_seconds - 1
+                continue
+            if _day != day:
+                day, second_of_day = _day, day_seconds - 1
+            if (_second_of_day := self.__last_second(second_of_day)) is None:
+                day, second_of_day = day - 1, day_seconds - 1
+                continue
+            return year, month, day, _second_of_day
+        return None
+
+    def __first_second(self, second_of_day: int) -> Optional[int]:
+        """earliest scheduled second of a day, not earlier than the given one"""
+        hour, second = divmod(second_of_day, 3600)
+        minute, second = divmod(second, 60)
+        while (_hour := self.__hours.first(hour)) is not None:
+            if _hour != hour:
+                hour, minute, second = _hour, 0, 0
+            if (_minute := self.__minutes.first(minute)) is None:
+                hour, minute, second = hour + 1, 0, 0
+                continue
+            if _minute != minute:
+                minute, second = _minute, 0
+            if (_second := self.__seconds.first(second)) is None:
+                minute, second = minute + 1, 0
+                continue
+            return hour * 3600 + minute * 60 + _second
+        return None
+
+    def __last_second(self, second_of_day: int) -> Optional[int]:
+        """latest scheduled second of a day, not later than the given one"""
+        hour, second = divmod(second_of_day, 3600)
+        minute, second = divmod(second, 60)
+        while (_hour := self.__hours.last(hour)) is not None:
+            if _hour != hour:
+                hour, minute, second = _hour, 59, 59
+            if (_minute := self.__minutes.last(minute)) is None:
+                hour, minute, second = hour - 1, 59, 59
+                continue
+            if _minute != minute:
+                minute, second = _minute, 59
+            if (_second := self.__seconds.last(second)) is None:
+                minute, second = minute - 1, 59
+                continue
+            return hour * 3600 + minute * 60 + _second
+        return None
+
+    def __first_day(self, year: int, month: int, day: int) -> Optional[int]:
+        days = self.__days_of(year, month) >> day << day
+        return (days & -days).bit_length() - 1 if days else None
+
+    def __last_day(self, year: int, month: int, day: int) -> Optional[int]:
+        days = self.__days_of(year, month) & ((2 << day) - 1)
+        return days.bit_length() - 1 if days else None
+
+    def __days_of(self, year: int, month: int) -> int:
+        """bitmask of scheduled days of the month"""
+        days_in_month, first_weekday = month_calendar(year)[month]
+        return self.__days.mask & weekday_days(self.__weekdays.mask, first_weekday, days_in_month)
 
 
 class FileChangedException(Exception):
@@ -324,212 +576,1691 @@ class WakeUpException(Exception):
     pass
 
 
+class FileWatcher(abc.ABC):
+    """
+    Notifies about changes of files, and of files in directories
+    """
+    burst_seconds = 0.01  # changes this close to each other are reported once
+
+    def __init__(self, *paths: str) -> None:
+        # paths of watched files by their (resolved) directories and names, paths of directories watched as a whole
+        self.__files: dict[str, dict[str, str]] = {}
+        self.__directories: dict[str, str] = {}
+        for path in paths:
+            if os.path.isdir(path):
+                self.__directories[os.path.realpath(path)] = path
+            else:
+                directory, name = os.path.split(os.path.abspath(path))
+                self.__files.setdefault(os.path.realpath(directory), {})[name] = path
+
+    @staticmethod
+    def create(*paths: str) -> FileWatcher:
+        if InotifyFileWatcher.is_supported():
+            try:
+                return InotifyFileWatcher(*paths)
+            except OSError as exception:
+                alert(exception)
+        return ProcessFileWatcher(*paths)
+
+    @abc.abstractmethod
+    def fileno(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def read(self) -> set[str]:
+        """consumes pending notifications. Paths of the changed files"""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        pass
+
+    def wait(self, timeout_seconds: Optional[float]) -> set[str]:
+        """paths of files changed (within `timeout_seconds`). Consumes pending notifications"""
+        changed: set[str] = set()
+        while select.select([self], [], [], self.burst_seconds if changed else timeout_seconds)[0]:
+            changed |= self.read()
+        return changed
+
+    def directories(self) -> dict[str, bool]:
+        """to watch: whether each is watched as a whole (including removals of files)"""
+        return {**{directory: False for directory in self.__files},
+                **{directory: True for directory in self.__directories}}
+
+    def paths(self) -> set[str]:
+        """of all watched files"""
+        return {path for files in self.__files.values() for path in files.values()} | set(self.__directories.values())
+
+    def path(self, directory: str, name: str, removed: bool = False) -> Optional[str]:
+        """of the watched file, that the notification is about. Removals matter in whole directories only"""
+        if not removed and (path := self.__files.get(directory, {}).get(name)) is not None:
+            return path
+        if (path := self.__directories.get(directory)) is not None:
+            return os.path.join(path, name)
+        return None
+
+
+class InotifyFileWatcher(FileWatcher):
+    """
+    Watches directories of the files, so that a file replaced by renaming (as some editors save) is noticed too
+    """
+    __in_close_write = 0x8
+    __in_moved_from = 0x40
+    __in_moved_to = 0x80
+    __in_delete = 0x200
+    __in_q_overflow = 0x4000
+    __in_ignored = 0x8000
+    __event = struct.Struct('iIII')
+
+    def __init__(self, *paths: str) -> None:
+        super().__init__(*paths)
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.__fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.__directories: dict[int, str] = {}  # by watch descriptors
+        for directory, is_whole in self.directories().items():
+            mask = self.__in_close_write | self.__in_moved_to
+            if is_whole:
+                mask |= self.__in_delete | self.__in_moved_from
+            if (wd := libc.inotify_add_watch(self.__fd, os.fsencode(directory), mask)) < 0:
+                _errno = ctypes.get_errno()
+                os.close(self.__fd)
+                raise OSError(_errno, 'inotify_add_watch failed: ' + directory)
+            self.__directories[wd] = directory
+
+    @staticmethod
+    def is_supported() -> bool:
+        return platform.system() == "Linux"
+
+    def fileno(self) -> int:
+        return self.__fd
+
+    def read(self) -> set[str]:
+        changed = set()
+        try:
+            data = os.read(self.__fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.__event.unpack_from(data, offset)
+            offset += self.__event.size
+            if mask & self.__in_ignored:
+                raise Exception('File watching stopped')
+            if mask & self.__in_q_overflow:
+                changed |= self.paths()
+            elif directory := self.__directories.get(wd):
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                if path := self.path(directory, name, bool(mask & (self.__in_delete | self.__in_moved_from))):
+                    changed.add(path)
+            offset += length
+        return changed
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+
+class ProcessFileWatcher(FileWatcher):
+    """
+    Changes are reported by an external tool: inotifywait or fswatch
+    """
+
+    def __init__(self, *paths: str) -> None:
+        super().__init__(*paths)
+        match system := platform.system():
+            case "Linux":
+                directories = self.directories()
+                events = ["--event", "CLOSE_WRITE", "--event", "MOVED_TO"]
+                if any(directories.values()):
+                    events += ["--event", "DELETE", "--event", "MOVED_FROM"]
+                self.__process = subprocess.Popen(("inotifywait", "--monitor", "--quiet", *events,
+                                                   "--format", "%e %w%f", *directories),
+                                                  stdout=subprocess.PIPE)
+            case "Darwin":
+                self.__process = subprocess.Popen(("fswatch", "--event", "Updated", "--event", "Removed",
+                                                   "--event-flag-separator", ",", "--format", "%f %p", *paths),
+                                                  stdout=subprocess.PIPE)
+            case _:
+                raise Exception(f"Unknown OS: {system}")
+        self.__output = b''
+        os.set_blocking(self.fileno(), False)
+
+    def fileno(self) -> int:
+        return self.__process.stdout.fileno()
+
+    def read(self) -> set[str]:
+        try:
+            output = os.read(self.fileno(), 4096)
+        except BlockingIOError:
+            return set()
+        if not output:
+            raise Exception('File watching stopped')
+        *lines, self.__output = (self.__output + output).split(b'\n')
+        changed = set()
+        for line in map(os.fsdecode, lines):
+            _, path = line.split(' ', 1)
+            directory, name = os.path.split(os.path.normpath(path))
+            removed = not os.path.exists(path)  # as the events of inotifywait and fswatch differ
+            if path := self.path(directory, name, removed):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        self.__process.terminate()
+        self.__process.wait(5)
+        self.__process.stdout.close()
+
+
+class DeadlineTimer:
+    """
+    Linux timerfd on the wall clock. Becomes readable once the given time comes, including after a suspend,
+    or if the clock is set
+    """
+    __clock_realtime = 0
+    __tfd_nonblock = os.O_NONBLOCK
+    __tfd_cloexec = os.O_CLOEXEC
+    __tfd_timer_abstime = 1
+    __tfd_timer_cancel_on_set = 2
+
+    class __Itimerspec(ctypes.Structure):
+        _fields_ = [('it_interval', ctypes.c_long * 2), ('it_value', ctypes.c_long * 2)]
+
+    def __init__(self) -> None:
+        self.__libc = ctypes.CDLL(None, use_errno=True)
+        self.__fd = self.__libc.timerfd_create(self.__clock_realtime, self.__tfd_nonblock | self.__tfd_cloexec)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'timerfd_create failed')
+
+    @staticmethod
+    def is_supported() -> bool:
+        return platform.system() == "Linux"
+
+    def fileno(self) -> int:
+        return self.__fd
+
+    def set(self, until: datetime) -> None:
+        seconds, microseconds = divmod(round(until.timestamp() * 1e6), 1_000_000)
+        spec = self.__Itimerspec()
+        spec.it_value[0] = seconds
+        spec.it_value[1] = microseconds * 1000
+        flags = self.__tfd_timer_abstime | self.__tfd_timer_cancel_on_set
+        if self.__libc.timerfd_settime(self.__fd, flags, ctypes.byref(spec), None) < 0:
+            raise OSError(ctypes.get_errno(), 'timerfd_settime failed')
+
+    def clear(self) -> None:
+        try:
+            os.read(self.__fd, 8)
+        except BlockingIOError:
+            pass
+        except OSError as error:
+            if error.errno != errno.ECANCELED:  # clock was set
+                raise
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+
 class Event:
     def __init__(self, _datetime: datetime, tasks: list[Task]) -> None:
         self.datetime = _datetime
         self.tasks = tasks
 
 
-class Cronus:
-    __file_watching_process: Union[subprocess.Popen, None]
-    __tasks: dict[int, Task] = {}
-    __next_events: list[Event] = []
-    __lines: list[str] = []
+class BatchEvaluator:
+    """
+    Next and missed calls of many tasks at once. Tasks with the same schedule are evaluated once. With numpy,
+    schedules are evaluated as arrays of bitmasks: days are matched for all of them at once, a month at a time,
+    and calls on days after (before) the given one are the first (last) seconds of the matched days. Calls on
+    the given day are evaluated by tasks
+    """
+    # to match days within (any date falls on every weekday within 28 years): schedules, that match later (earlier),
+    # are evaluated by tasks
+    horizon_months = 29 * 12
+
+    def __init__(self, tasks: Iterable[Task], vectorized: bool = True) -> None:
+        self.__tasks = list(tasks)
+        # ids of tasks by schedules. Fields are shared, so tasks of the same fields have the same schedule
+        schedules: dict[tuple[Field, ...], list[int]] = {}
+        for task_id, task in enumerate(self.__tasks):
+            schedules.setdefault(task.schedule(), []).append(task_id)
+        self.__schedules = list(schedules.values())
+        self.__vectorized = vectorized and numpy is not None and bool(self.__schedules)
+        if self.__vectorized:
+            months, days, weekdays, hours, minutes, seconds = zip(*schedules)
+            self.__months = numpy.array([field.mask for field in months], dtype=numpy.uint64)
+            self.__days = numpy.array([field.mask for field in days], dtype=numpy.uint64)
+            self.__weekdays = numpy.array([field.mask for field in weekdays], dtype=numpy.int64)
+            self.__first_seconds = numpy.array([hours.first(0) * 3600 + minutes.first(0) * 60 + seconds.first(0)
+                                                for hours, minutes, seconds in zip(hours, minutes, seconds)],
+                                               dtype=numpy.int64)
+            self.__last_seconds = numpy.array([hours.last(23) * 3600 + minutes.last(59) * 60 + seconds.last(59)
+                                               for hours, minutes, seconds in zip(hours, minutes, seconds)],
+                                              dtype=numpy.int64)
+
+    def next_calls(self, _from: datetime) -> list[tuple[Task, Optional[datetime]]]:
+        """first call of each task, not earlier than `_from` (as `Task.calls`), in the order of tasks"""
+        after = _from - timedelta(microseconds=1)
+        calls: list[Optional[datetime]] = [None] * len(self.__tasks)
+        for task_ids, _call in zip(self.__schedules, self.__calls(after, 1)):
+            for task_id in task_ids:
+                task = self.__tasks[task_id]
+                if task.last_call() < after:
+                    calls[task_id] = _call
+                else:  # called later already
+                    calls[task_id] = next(task.calls(_from), None)
+        return list(zip(self.__tasks, calls))
+
+    def missed_calls(self, now: datetime) -> list[tuple[Task, datetime]]:
+        """tasks, that were not called at their latest scheduled time (as `Task.missed_call`), in the order of tasks"""
+        missed_calls: list[Optional[datetime]] = [None] * len(self.__tasks)
+        for task_ids, _call in zip(self.__schedules, self.__calls(now, -1)):
+            if _call is not None:
+                for task_id in task_ids:
+                    if self.__tasks[task_id].last_call() < _call:
+                        missed_calls[task_id] = _call
+        return [(task, _call) for task, _call in zip(self.__tasks, missed_calls) if _call is not None]
+
+    def __calls(self, _time: datetime, direction: int) -> list[Optional[datetime]]:
+        """of schedules: the earliest calls later than `_time` (1), or the latest ones earlier than it (-1)"""
+        if not self.__vectorized:
+            return [self.__call(task_ids, _time, direction) for task_ids in self.__schedules]
+        start = _time.toordinal()
+        days = numpy.full(len(self.__schedules), start, dtype=numpy.int64)  # ordinals of the first (last) matched days
+        pending = numpy.arange(len(self.__schedules))
+        year, month, day = _time.year, _time.month, _time.day
+        searched_month: Optional[tuple[int, int, int]] = None  # the last one: year, month, days in month
+        for _ in range(self.horizon_months):
+            if not pending.size or not MINYEAR <= year <= MAXYEAR:
+                break
+            days_in_month, first_weekday = month_calendar(year)[month]
+            # days of the month from `day` on (up to it)
+            allowed = ((2 << days_in_month) - 1) >> day << day if direction > 0 else (2 << min(day, days_in_month)) - 2
+            is_month = self.__months[pending] >> numpy.uint64(month) & numpy.uint64(1) == 1
+            matched_days = numpy.where(is_month, self.__days[pending] & numpy.uint64(allowed), numpy.uint64(0)) \
+                & self.__weekday_days()[self.__weekdays[pending], first_weekday]
+            is_matched = matched_days != 0
+            matched_days = matched_days[is_matched]
+            if direction > 0:
+                matched_days &= ~matched_days + numpy.uint64(1)  # the lowest day only
+            # the highest day (exactly, as days take fewer bits than the mantissa of a float)
+            days[pending[is_matched]] = date(year, month, 1).toordinal() - 1 \
+                + numpy.log2(matched_days.astype(numpy.float64)).astype(numpy.int64)
+            pending = pending[~is_matched]
+            searched_month = year, month, days_in_month
+            year, month = divmod(year * 12 + month - 1 + direction, 12)
+            month += 1
+            day = 1 if direction > 0 else 31
+        seconds = (days - date(1970, 1, 1).toordinal()) * day_seconds \
+            + (self.__first_seconds if direction > 0 else self.__last_seconds)
+        calls = seconds.astype('datetime64[s]').tolist()
+        pending = set(pending.tolist())
+        for schedule_id in numpy.flatnonzero(days == start).tolist():  # the given day, or none matched
+            bound = _time
+            if schedule_id in pending and searched_month:
+                # none of the days searched matches: the rest is evaluated by the task
+                year, month, days_in_month = searched_month
+                bound = datetime(year, month, days_in_month, 23, 59, 59) if direction > 0 else datetime(year, month, 1)
+            calls[schedule_id] = self.__call(self.__schedules[schedule_id], bound, direction)
+        return calls
+
+    def __call(self, task_ids: list[int], _time: datetime, direction: int) -> Optional[datetime]:
+        task = self.__tasks[task_ids[0]]
+        return task.next_call(_time) if direction > 0 else task.prev_call(_time)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def __weekday_days() -> numpy.ndarray:
+        """days of months (of 31 days) by weekdays (bitmasks) and weekdays of the first days of months"""
+        return numpy.array([[weekday_days(weekdays, first_weekday, 31) for first_weekday in range(8)]
+                            for weekdays in range(1 << 8)], dtype=numpy.uint64)
+
+
+class Scheduler:
+    """
+    Priority queue of tasks, keyed by their next call. Holds one live entry per task: replaced entries stay in the
+    heap, dead, until popped or until they outnumber the live ones
+    """
+
+    def __init__(self) -> None:
+        self.__heap: list[list] = []
+        self.__entries: dict[Task, list] = {}
+        self.__orders: dict[Task, int] = {}
+        self.__counter = itertools.count()
+        self.__dead_entries = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, task: Task) -> bool:
+        return task in self.__orders
+
+    def heap_size(self) -> int:
+        """live and dead entries"""
+        return len(self.__heap)
+
+    def add(self, task: Task, _from: datetime) -> None:
+        self.__orders.setdefault(task, next(self.__counter))
+        self.__push(task, _from)
+
+    def add_all(self, tasks: Iterable[Task], _from: datetime) -> None:
+        """adds the tasks (as `add` does), evaluating them at once"""
+        for task, _call in BatchEvaluator(tasks).next_calls(_from):
+            self.__orders.setdefault(task, next(self.__counter))
+            if _call:
+                self.__push_entry(task, _call)
+            else:
+                self.__kill(task)
+
+    def call_at(self, task: Task, _time: datetime) -> None:
+        """adds a call of the task at `_time`, unless the task is to be called before anyway"""
+        self.__orders.setdefault(task, next(self.__counter))
+        if (entry := self.__entries.get(task)) and entry[0] <= _time:
+            return
+        self.__push_entry(task, _time)
+
+    def remove(self, task: Task) -> None:
+        self.__orders.pop(task, None)
+        self.__kill(task)
+
+    def clear(self) -> None:
+        self.__heap.clear()
+        self.__entries.clear()
+        self.__orders.clear()
+        self.__dead_entries = 0
+
+    def next_time(self) -> Optional[datetime]:
+        while self.__heap and self.__heap[0][-1] is None:
+            heapq.heappop(self.__heap)
+            self.__dead_entries -= 1
+        return self.__heap[0][0] if self.__heap else None
+
+    def pop_event(self) -> Optional[Event]:
+        if (_time := self.next_time()) is None:
+            return None
+        tasks = []
+        while self.__heap and self.__heap[0][0] == _time:
+            if task := heapq.heappop(self.__heap)[-1]:
+                del self.__entries[task]
+                tasks.append(task)
+            else:
+                self.__dead_entries -= 1
+        return Event(_time, tasks)
+
+    def reschedule(self, event: Event) -> None:
+        for task in event.tasks:
+            if task in self.__orders:
+                self.__push(task, event.datetime + timedelta(microseconds=1))
+
+    def __push(self, task: Task, _from: datetime) -> None:
+        if _call := next(task.calls(_from), None):
+            self.__push_entry(task, _call)
+        else:
+            self.__kill(task)
+
+    def __push_entry(self, task: Task, _time: datetime) -> None:
+        self.__kill(task)
+        entry = [_time, self.__orders[task], next(self.__counter), task]
+        self.__entries[task] = entry
+        heapq.heappush(self.__heap, entry)
+
+    def __kill(self, task: Task) -> None:
+        """the entry of the task, if any. Rebuilds the heap without dead entries once they outnumber the live ones"""
+        if entry := self.__entries.pop(task, None):
+            entry[-1] = None
+            self.__dead_entries += 1
+            if self.__dead_entries > len(self.__entries):
+                self.__heap = [entry for entry in self.__heap if entry[-1] is not None]
+                heapq.heapify(self.__heap)
+                self.__dead_entries = 0
+
+
+class Timeline:
+    """
+    Calls of tasks within ranges of time. Tasks are indexed by schedules, so that calls are counted per day from
+    the fields of each distinct schedule, instead of being enumerated
+    """
+
+    def __init__(self, tasks: Iterable[Task]) -> None:
+        schedules: dict[tuple[int, ...], tuple[tuple[Field, ...], list[Task]]] = {}
+        for task in tasks:
+            schedule = task.schedule()
+            schedules.setdefault(tuple(field.mask for field in schedule), (schedule, []))[1].append(task)
+        self.__schedules = list(schedules.values())
+        # schedules grouped by days (months, days, weekdays): times of day (hours, minutes, seconds), numbers of tasks
+        days: dict[tuple[int, ...], tuple[tuple[Field, ...], list[tuple[tuple[Field, ...], int]]]] = {}
+        for schedule, _tasks in self.__schedules:
+            days.setdefault(tuple(field.mask for field in schedule[:3]), (schedule[:3], []))[1] \
+                .append((schedule[3:], len(_tasks)))
+        self.__days = list(days.values())
+        self.__calls_per_day = [sum(tasks * self.__count_before(times, day_seconds) for times, tasks in times)
+                                for _, times in self.__days]
+
+    def calls(self, _from: datetime, _to: datetime) -> Iterator[Event]:
+        """within [_from, _to), lazily and in order. Tasks called at the same time make one event"""
+        calls = heapq.merge(*(self.__calls(schedule_id, _from, _to) for schedule_id in range(len(self.__schedules))))
+        for _time, same_calls in itertools.groupby(calls, key=lambda call: call[0]):
+            yield Event(_time, [task for _, schedule_id in same_calls for task in self.__schedules[schedule_id][1]])
+
+    def count(self, _from: datetime, _to: datetime) -> int:
+        """of calls within [_from, _to): each task called counts"""
+        count = 0
+        for day, first_second, end_second in self.__days_of(_from, _to):
+            for (fields, times), calls_per_day in zip(self.__days, self.__calls_per_day):
+                if self.__is_day(day, *fields):
+                    if end_second - first_second == day_seconds:
+                        count += calls_per_day
+                    else:
+                        count += sum(tasks * (self.__count_before(times, end_second)
+                                              - self.__count_before(times, first_second))
+                                     for times, tasks in times)
+        return count
+
+    def busiest(self, _from: datetime, _to: datetime, number: int = 10) -> list[tuple[datetime, int]]:
+        """seconds within [_from, _to) with the most tasks called, and their numbers. Earlier ones go first on a tie"""
+        # days, on which the same schedules are active, have the same load
+        loads: dict[tuple[int, ...], list[int]] = {}
+        busiest_seconds: dict[tuple[int, ...], list[int]] = {}
+        candidates: list[tuple[int, datetime]] = []
+        for day, first_second, end_second in self.__days_of(_from, _to):
+            profile = tuple(i for i, (fields, _) in enumerate(self.__days) if self.__is_day(day, *fields))
+            if not profile:
+                continue
+            if profile not in loads:
+                loads[profile] = self.__loads(profile)
+            load = loads[profile]
+            if end_second - first_second == day_seconds:
+                if profile not in busiest_seconds:
+                    busiest_seconds[profile] = heapq.nlargest(number, range(day_seconds), key=load.__getitem__)
+                seconds = busiest_seconds[profile]
+            else:
+                seconds = heapq.nlargest(number, range(first_second, end_second), key=load.__getitem__)
+            midnight = datetime(day.year, day.month, day.day)
+            candidates += [(load[second], midnight + timedelta(seconds=second)) for second in seconds if load[second]]
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        return [(_time, count) for count, _time in candidates[:number]]
+
+    def __calls(self, schedule_id: int, _from: datetime, _to: datetime) -> Iterator[tuple[datetime, int]]:
+        task = self.__schedules[schedule_id][1][0]
+        _call = task.next_call(_from - timedelta(microseconds=1))
+        while _call is not None and _call < _to:
+            yield _call, schedule_id
+            _call = task.next_call(_call)
+
+    def __loads(self, profile: tuple[int, ...]) -> list[int]:
+        """numbers of tasks called at each second of a day, on which the schedules of `profile` are active"""
+        load = [0] * day_seconds
+        for i in profile:
+            for (hours, minutes, seconds), tasks in self.__days[i][1]:
+                for hour in hours:
+                    for minute in minutes:
+                        start = hour * 3600 + minute * 60
+                        for second in seconds:
+                            load[start + second] += tasks
+        return load
+
+    @classmethod
+    def __days_of(cls, _from: datetime, _to: datetime) -> Iterator[tuple[date, int, int]]:
+        """days of the range, with the range of their seconds: [first, end)"""
+        day = _from.date()
+        while (midnight := datetime(day.year, day.month, day.day)) < _to:
+            first_second = max(math.ceil((_from - midnight).total_seconds()), 0)
+            end_second = min(math.ceil((_to - midnight).total_seconds()), day_seconds)
+            if first_second < end_second:
+                yield day, first_second, end_second
+            day += timedelta(days=1)
+
+    @staticmethod
+    def __is_day(day: date, months: Field, days: Field, weekdays: Field) -> bool:
+        return months.mask >> day.month & days.mask >> day.day & weekdays.mask >> day.isoweekday() & 1 == 1
+
+    @staticmethod
+    def __count_before(times: tuple[Field, ...], second_of_day: int) -> int:
+        """of times of day, earlier than `second_of_day`"""
+        hours, minutes, seconds = times
+        hour, second = divmod(second_of_day, 3600)
+        minute, second = divmod(second, 60)
+        if hour == 24:
+            return len(hours) * len(minutes) * len(seconds)
+        return (hours.count_below(hour) * len(minutes) * len(seconds)
+                + (hour in hours) * (minutes.count_below(minute) * len(seconds)
+                                     + (minute in minutes) * seconds.count_below(second)))
+
+
+class StateFile:
+    """
+    Last calls of tasks, kept aside from the crontab: an append-only log of `<timestamp> <task key>` lines,
+    compacted once it holds more than twice as many records as there are tasks, plus `slack_records`
+    """
+    slack_records = 1000  # so that small logs are not compacted every few saves
+
+    def __init__(self, filename: str) -> None:
+        self.__filename = filename
+        self.__last_calls: dict[str, int] = {}
+        self.__records = 0
+        self.__is_line_broken = False  # e.g. by a crash while appending
+        if os.path.exists(filename):
+            with open(filename, 'r') as file:
+                for line in file:
+                    match line.split():
+                        case [timestamp, key] if timestamp.isdigit():
+                            self.__last_calls[key] = int(timestamp)
+                            self.__records += 1
+                    self.__is_line_broken = not line.endswith('\n')
+
+    def restore(self, task: Task) -> None:
+        if (timestamp := self.__last_calls.get(self.__key(task))) is not None:
+            task.update_last_call(datetime.fromtimestamp(timestamp))
+
+    def save(self, tasks: Iterable[Task]) -> None:
+        records = []
+        for task in tasks:
+            key = self.__key(task)
+            timestamp = int(task.last_call().timestamp())
+            if self.__last_calls.get(key) != timestamp:
+                self.__last_calls[key] = timestamp
+                records.append(f"{timestamp} {key}\n")
+        if records:
+            if self.__is_line_broken:
+                records.insert(0, '\n')
+                self.__is_line_broken = False
+            with open(self.__filename, 'a') as file:
+                file.writelines(records)
+            self.__records += len(records)
+
+    def compact(self, tasks: Collection[Task]) -> None:
+        if self.__records <= 2 * len(tasks) + self.slack_records:
+            return
+        keys = {self.__key(task) for task in tasks}
+        self.__last_calls = {key: timestamp for key, timestamp in self.__last_calls.items() if key in keys}
+        with open(self.__filename + '.tmp', 'w') as file:
+            file.writelines(f"{timestamp} {key}\n" for key, timestamp in self.__last_calls.items())
+        os.replace(self.__filename + '.tmp', self.__filename)
+        self.__records = len(self.__last_calls)
+
+    @staticmethod
+    def __key(task: Task) -> str:
+        return hashlib.blake2b(task.definition().encode(), digest_size=8).hexdigest()
+
+
+class Histogram:
+    """
+    Counts of observed durations (seconds) per bucket, as in Prometheus
+    """
+    buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1., 5., 10., 60., 600.)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is over all buckets
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def lines(self, name: str) -> list[str]:
+        lines = []
+        for bucket, count in zip(self.buckets + ('+Inf',), itertools.accumulate(self.counts)):
+            lines.append(f'{name}_bucket{{le="{bucket}"}} {count}')
+        return lines + [f'{name}_sum {self.sum}', f'{name}_count {self.count}']
+
+
+class Metrics:
+    """
+    Histograms, gauges and counters of the daemon. Dumped as a file in the Prometheus text format (f.e. for the
+    textfile collector of node_exporter)
+    """
+
+    def __init__(self) -> None:
+        self.__histograms: dict[str, Histogram] = {}
+        self.__values: dict[str, tuple[str, float]] = {}  # types and values
+
+    def histogram(self, name: str, histogram: Optional[Histogram] = None) -> Histogram:
+        """the one of the name. Registers `histogram` under it, if given"""
+        if histogram:
+            self.__histograms[name] = histogram
+        elif name not in self.__histograms:
+            self.__histograms[name] = Histogram()
+        return self.__histograms[name]
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe(time.perf_counter() - start)
+
+    def set(self, name: str, value: float, _type: str = 'gauge') -> None:
+        self.__values[name] = (_type, value)
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.set(name, self.__values.get(name, ('counter', 0))[1] + value, 'counter')
+
+    def text(self) -> str:
+        lines = []
+        for name, histogram in sorted(self.__histograms.items()):
+            lines.append(f'# TYPE {name} histogram')
+            lines += histogram.lines(name)
+        for name, (_type, value) in sorted(self.__values.items()):
+            lines.append(f'# TYPE {name} {_type}')
+            lines.append(f'{name} {value}')
+        return ''.join(line + '\n' for line in lines)
+
+    def dump(self, filename: str) -> None:
+        with open(filename + '.tmp', 'w') as file:
+            file.write(self.text())
+        os.replace(filename + '.tmp', filename)
+
+
+class Supervisor:
+    """
+    Keeps track of started commands, each leading its own process group. Exits are read from pidfds in an epoll,
+    if supported, instead of polling each process. Groups are terminated without waiting for them, and killed later,
+    if still there
+    """
+    kill_after_seconds = 5.
+    __polling_seconds = 0.1
+
+    def __init__(self) -> None:
+        self.__callbacks: dict[subprocess.Popen, Optional[Callable[[], None]]] = {}
+        self.__pidfds: dict[subprocess.Popen, int] = {}
+        self.__processes: dict[int, subprocess.Popen] = {}  # by pidfds
+        self.__polled: set[subprocess.Popen] = set()  # those, whose exits cannot be waited on
+        self.__terminating: dict[subprocess.Popen, float] = {}
+        self.__epoll: Optional[select.epoll] = None
+
+    def watch(self, process: subprocess.Popen, on_exit: Optional[Callable[[], None]] = None) -> None:
+        self.__callbacks[process] = on_exit
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):  # before python 3.9 or linux 5.3
+            self.__polled.add(process)
+            return
+        if not self.__epoll:
+            self.__epoll = select.epoll()
+        self.__epoll.register(pidfd, select.EPOLLIN)
+        self.__pidfds[process] = pidfd
+        self.__processes[pidfd] = process
+
+    def reap(self) -> None:
+        """reaps exited processes (calling back about them), kills groups not terminated in time"""
+        exited = [self.__processes[pidfd] for pidfd, _ in self.__epoll.poll(0)] if self.__epoll else []
+        for process in exited + list(self.__polled):
+            if process.poll() is not None:
+                self.__forget(process)
+                if on_exit := self.__callbacks.pop(process):
+                    on_exit()
+        if self.__terminating:
+            now = time.monotonic()
+            for process, deadline in list(self.__terminating.items()):
+                if deadline <= now:
+                    # the leader is reaped only now, so that its pid cannot be taken by another group meanwhile
+                    self.__signal(process, signal.SIGKILL)
+                    if process.poll() is None:
+                        self.__terminating[process] = now + self.__polling_seconds
+                    else:
+                        del self.__terminating[process]
+
+    def terminate(self, process: subprocess.Popen) -> None:
+        """stops watching the process (no callback), terminates its group"""
+        if process in self.__callbacks:
+            del self.__callbacks[process]
+            self.__forget(process)
+        if process.returncode is None and process not in self.__terminating:
+            self.__signal(process, signal.SIGTERM)
+            self.__terminating[process] = time.monotonic() + self.kill_after_seconds
+
+    def fds(self) -> list[int]:
+        """become readable, when a watched process exits"""
+        return [self.__epoll.fileno()] if self.__epoll else []
+
+    def polling_seconds(self, exits: bool = True) -> Optional[float]:
+        """in how long to reap: to poll for exits (if needed), or to kill groups not terminated in time"""
+        seconds = [self.__polling_seconds] if exits and self.__polled else []
+        if self.__terminating:
+            seconds.append(max(min(self.__terminating.values()) - time.monotonic(), 0.))
+        return min(seconds, default=None)
+
+    def __forget(self, process: subprocess.Popen) -> None:
+        self.__polled.discard(process)
+        if (pidfd := self.__pidfds.pop(process, None)) is not None:
+            del self.__processes[pidfd]
+            self.__epoll.unregister(pidfd)
+            os.close(pidfd)
+
+    @staticmethod
+    def __signal(process: subprocess.Popen, signal_number: int) -> None:
+        try:
+            os.killpg(process.pid, signal_number)
+        except ProcessLookupError:
+            pass
+
+
+supervisor = Supervisor()
+
+
+class Admission:
+    """
+    Tells whether to start tasks, or to defer them while the host is saturated: while the load average per CPU,
+    the usage of CPU or of memory (percent) is over its limit. Tasks of a positive priority are never deferred,
+    others at most for their max delay
+    """
+    sampling_seconds = 1.  # the host is sampled at most that often
+
+    def __init__(self,
+                 max_load: Optional[float] = None,
+                 max_cpu_percent: Optional[float] = None,
+                 max_memory_percent: Optional[float] = None,
+                 max_delay_seconds: float = 300.,
+                 retry_seconds: float = 5.) -> None:
+        self.__max_load = max_load
+        self.__max_cpu_percent = max_cpu_percent
+        self.__max_memory_percent = max_memory_percent
+        self.__max_delay_seconds = max_delay_seconds
+        self.__retry_seconds = retry_seconds
+        self.__sampled_at: Optional[float] = None
+        self.__is_saturated = False
+        if max_cpu_percent is not None:
+            psutil.cpu_percent()  # usage is measured since the previous call
+
+    def admits(self, task: Task, deferred_seconds: float = 0.) -> bool:
+        if task.priority() > 0 or deferred_seconds >= self.max_delay_seconds(task):
+            return True
+        return not self.is_saturated()
+
+    def is_saturated(self) -> bool:
+        now = time.monotonic()
+        if self.__sampled_at is None or now - self.__sampled_at >= self.sampling_seconds:
+            self.__sampled_at = now
+            self.__is_saturated = self.__sample()
+        return self.__is_saturated
+
+    def max_delay_seconds(self, task: Task) -> float:
+        _max_delay_seconds = task.max_delay_seconds()
+        return self.__max_delay_seconds if _max_delay_seconds is None else _max_delay_seconds
+
+    def retry_seconds(self) -> float:
+        """until a deferred task is retried. Jittered, so that deferred tasks do not come back all at once"""
+        return self.__retry_seconds * random.uniform(0.5, 1.5)
+
+    def __sample(self) -> bool:
+        # the cheapest first
+        if self.__max_load is not None and psutil.getloadavg()[0] / (psutil.cpu_count() or 1) > self.__max_load:
+            return True
+        if self.__max_cpu_percent is not None and psutil.cpu_percent() > self.__max_cpu_percent:
+            return True
+        return self.__max_memory_percent is not None and psutil.virtual_memory().percent > self.__max_memory_percent
+
+
+class Executor:
+    """
+    Runs commands of tasks: at most `max_processes` at once (if set), and at most `max_instances` of each task.
+    Calls over the global limit wait in a FIFO queue. A task takes at most one place in it per instance it may
+    still start, so that frequent tasks cannot crowd out others. Calls, not admitted on a saturated host, are
+    deferred, and retried later
+    """
+
+    def __init__(self,
+                 max_processes: Optional[int] = None,
+                 max_instances: int = 1,
+                 _supervisor: Optional[Supervisor] = None,
+                 admission: Optional[Admission] = None) -> None:
+        self.__max_processes = max_processes
+        self.__max_instances = max_instances
+        self.__supervisor = _supervisor or supervisor
+        self.__admission = admission
+        self.__running: dict[Task, list[subprocess.Popen]] = {}
+        self.__processes = 0
+        self.__queue: collections.deque[tuple[Task, float]] = collections.deque()
+        # heap of deferred calls: when to retry, order of deferring, task, when deferred
+        self.__deferred: list[tuple[float, int, Task, float]] = []
+        self.__deferring_order = itertools.count()
+        self.__queued: collections.Counter[Task] = collections.Counter()  # queued and deferred calls
+        self.__metrics = {'started': 0,
+                          'skipped': 0,
+                          'deferred': 0,
+                          'max_queue_depth': 0,
+                          'wait_seconds_total': 0.,
+                          'wait_seconds_max': 0.}
+        self.__spawn_seconds = Histogram()
+
+    def submit(self, task: Task) -> None:
+        """starts the task, or queues it. Skips it, if all its instances are already running or queued"""
+        self.__supervisor.reap()
+        if len(self.__running.get(task, ())) + self.__queued[task] >= self.__max_instances:
+            self.__metrics['skipped'] += 1
+            return
+        task.mark_called()
+        if self.__admission and not self.__admission.admits(task):
+            self.__metrics['deferred'] += 1
+            self.__queued[task] += 1
+            self.__defer(task, time.monotonic())
+        else:
+            self.__enqueue(task, time.monotonic())
+
+    def poll(self) -> None:
+        """reaps finished processes, and starts queued tasks instead. Retries deferred tasks, when it is time"""
+        self.__supervisor.reap()
+        if self.__deferred:
+            self.__admit()
+        while self.__queue and not self.__is_full():
+            task, queued_at = self.__queue.popleft()
+            self.__dequeue(task)
+            self.__start(task, queued_at)
+
+    def discard(self, task: Task) -> None:
+        """forgets the task: drops its queued calls, terminates its processes (without waiting for them)"""
+        if self.__queued.pop(task, None):
+            self.__queue = collections.deque(call for call in self.__queue if call[0] is not task)
+            self.__deferred = [call for call in self.__deferred if call[2] is not task]
+            heapq.heapify(self.__deferred)
+        for process in self.__running.pop(task, []):
+            self.__supervisor.terminate(process)
+            self.__processes -= 1
+
+    def fds(self) -> list[int]:
+        """to wait on, while there are queued tasks: become readable when a process exits"""
+        return self.__supervisor.fds() if self.__queue else []
+
+    def polling_seconds(self) -> Optional[float]:
+        """how often to poll, if exits of processes cannot be waited on, or processes are to be killed, or deferred
+        tasks are to be retried"""
+        seconds = self.__supervisor.polling_seconds(bool(self.__queue))
+        if self.__deferred:
+            retry_seconds = max(self.__deferred[0][0] - time.monotonic(), 0.)
+            seconds = retry_seconds if seconds is None else min(seconds, retry_seconds)
+        return seconds
+
+    def metrics(self) -> dict[str, float]:
+        return {**self.__metrics,
+                'running': self.__processes,
+                'queue_depth': len(self.__queue),
+                'deferred_depth': len(self.__deferred)}
+
+    def spawn_seconds(self) -> Histogram:
+        return self.__spawn_seconds
+
+    def __is_full(self) -> bool:
+        return self.__max_processes is not None and self.__processes >= self.__max_processes
+
+    def __enqueue(self, task: Task, queued_at: float) -> None:
+        if self.__queue or self.__is_full():
+            self.__queue.append((task, queued_at))
+            self.__queued[task] += 1
+            self.__metrics['max_queue_depth'] = max(self.__metrics['max_queue_depth'], len(self.__queue))
+        else:
+            self.__start(task, queued_at)
+
+    def __dequeue(self, task: Task) -> None:
+        self.__queued[task] -= 1
+        if not self.__queued[task]:
+            del self.__queued[task]
+
+    def __defer(self, task: Task, deferred_at: float) -> None:
+        retry_at = min(time.monotonic() + self.__admission.retry_seconds(),
+                       deferred_at + self.__admission.max_delay_seconds(task))
+        heapq.heappush(self.__deferred, (retry_at, next(self.__deferring_order), task, deferred_at))
+
+    def __admit(self) -> None:
+        """retries deferred tasks, that are due: of higher priority first"""
+        now = time.monotonic()
+        due_calls = []
+        while self.__deferred and self.__deferred[0][0] <= now:
+            due_calls.append(heapq.heappop(self.__deferred))
+        due_calls.sort(key=lambda call: -call[2].priority())
+        for _, _, task, deferred_at in due_calls:
+            if self.__admission.admits(task, now - deferred_at):
+                self.__dequeue(task)
+                self.__enqueue(task, deferred_at)
+            else:
+                self.__defer(task, deferred_at)
+
+    def __start(self, task: Task, queued_at: float) -> None:
+        waited = time.monotonic() - queued_at
+        self.__metrics['started'] += 1
+        self.__metrics['wait_seconds_total'] += waited
+        self.__metrics['wait_seconds_max'] = max(self.__metrics['wait_seconds_max'], waited)
+        start = time.perf_counter()
+        process = task.spawn()
+        self.__spawn_seconds.observe(time.perf_counter() - start)
+        if process:
+            self.__running.setdefault(task, []).append(process)
+            self.__processes += 1
+            self.__supervisor.watch(process, functools.partial(self.__exited, task, process))
+
+    def __exited(self, task: Task, process: subprocess.Popen) -> None:
+        processes = self.__running[task]
+        processes.remove(process)
+        if not processes:
+            del self.__running[task]
+        self.__processes -= 1
+
+
+class DryRunExecutor(Executor):
+    """
+    Prints calls of tasks, instead of running them
+    """
+
+    def __init__(self, clock: Clock, output: TextIO = sys.stdout) -> None:
+        super().__init__()
+        self.__clock = clock
+        self.__output = output
+
+    def submit(self, task: Task) -> None:
+        task.mark_called()
+        print(f"{self.__clock.time():%Y-%m-%d %H:%M:%S} {task.definition().strip()}", file=self.__output)
+
+
+def parse_lines(lines: list[str]) -> list[Union[tuple, Exception, None]]:
+    """`Task.parse` of each line, or the error of it. Called in workers of a process pool"""
+    specs: list[Union[tuple, Exception, None]] = []
+    for line in lines:
+        try:
+            specs.append(Task.parse(line))
+        except Exception as exception:
+            specs.append(exception)
+    return specs
+
+
+class Crontab:
+    """
+    Tasks of a crontab file. It is re-read incrementally; last calls are saved back into it, or into a state file.
+    Large numbers of changed lines are parsed by a pool of processes
+    """
+    parallel_lines = 50_000  # changed lines, from which on they are parsed in parallel
 
     def __init__(self,
                  filename: str,
                  clock: Clock,
-                 sleep_interval_seconds: float = 5) -> None:
-        self.__clock = clock  # workaround, because python's unittest cannot mock with lambda
-        self.__queue_interval = timedelta(days=1)
-        self.__wakeup_interval_seconds = timedelta(minutes=10).total_seconds()
-        self.__saving_interval = timedelta(seconds=5)
-        self.__sleep_interval_seconds = sleep_interval_seconds
+                 state_filename: Optional[str] = None,
+                 parse_workers: Optional[int] = None) -> None:
         self.__filename = filename
-        self.__file_watching_queue = queue.Queue()
+        self.__clock = clock
+        self.__parse_workers = parse_workers or os.cpu_count() or 1  # parsing is serial with a single worker
+        # if set, last calls are saved there instead of the crontab
+        self.__state = StateFile(state_filename) if state_filename else None
+        self.__unsaved_tasks: set[Task] = set()
+        self.__tasks: dict[int, Task] = {}
+        self.__lines: list[str] = []
+        self.__failed_lines: set[int] = set()
+        self.__mtime = None
+
+    def tasks(self) -> Iterable[Task]:
+        return self.__tasks.values()
+
+    def read(self) -> list[Task]:
+        """re-reads the file. Returns the tasks, that are gone from it"""
+        self.__mtime = os.path.getmtime(self.__filename)
+        with open(self.__filename, 'r') as file:
+            lines = file.readlines()
+
+        # lines are matched by content, so that tasks survive shifting lines
+        known_lines: dict[str, list[Optional[Task]]] = {}
+        for line_id, line in enumerate(self.__lines):
+            if line_id not in self.__failed_lines:
+                known_lines.setdefault(line, []).append(self.__tasks.get(line_id))
+
+        tasks: dict[int, Task] = {}
+        changed_lines: list[int] = []
+        for line_id, line in enumerate(lines):
+            if known_lines.get(line):
+                if task := known_lines[line].pop(0):
+                    task.rebind(line)
+                    tasks[line_id] = task
+            else:
+                changed_lines.append(line_id)
+
+        removed_tasks: dict[str, list[Task]] = {}
+        for known_tasks in known_lines.values():
+            for task in known_tasks:
+                if task:
+                    removed_tasks.setdefault(task.definition(), []).append(task)
+
+        self.__failed_lines = set()
+        for line_id, spec in zip(changed_lines, self.__parse([lines[line_id] for line_id in changed_lines])):
+            try:
+                if isinstance(spec, Exception):
+                    raise spec
+                if spec:
+                    task = Task.from_spec(lines[line_id], spec, self.__clock)
+                    if self.__state:
+                        self.__state.restore(task)
+                    if same_tasks := removed_tasks.get(task.definition()):
+                        old_task = same_tasks.pop(0)
+                        old_task.copy_last_call(task)
+                        old_task.rebind(lines[line_id])
+                        task = old_task
+                    tasks[line_id] = task
+            except Exception as exception:
+                self.__failed_lines.add(line_id)
+                alert(exception)
+
+        self.__lines = lines
+        self.__tasks = tasks
+        return [task for same_tasks in removed_tasks.values() for task in same_tasks]
+
+    def __parse(self, lines: list[str]) -> list[Union[tuple, Exception, None]]:
+        """`parse_lines`, in chunks by workers if there are enough lines. The order of lines is kept"""
+        if self.__parse_workers < 2 or len(lines) < self.parallel_lines:
+            return parse_lines(lines)
+        chunk_size = math.ceil(len(lines) / self.__parse_workers)
+        with concurrent.futures.ProcessPoolExecutor(self.__parse_workers) as pool:
+            chunks = pool.map(parse_lines, [lines[start:start + chunk_size]
+                                            for start in range(0, len(lines), chunk_size)])
+            return [spec for specs in chunks for spec in specs]
+
+    def executed(self, task: Task) -> None:
+        if self.__state:
+            self.__unsaved_tasks.add(task)
+
+    def write(self) -> bool:
+        """saves last calls. Whether the crontab itself was written (the watcher of it is to be notified)"""
+        if self.__state:
+            self.__state.save(self.__unsaved_tasks)
+            self.__unsaved_tasks.clear()
+            self.__state.compact(self.__tasks.values())
+        elif self.__tasks and self.__lines:
+            new_lines = self.__lines[:]
+            for task_id, task in self.__tasks.items():
+                new_lines[task_id] = str(task) + '\n'
+            if new_lines != self.__lines:
+                with open(self.__filename, 'w') as file:
+                    file.writelines(new_lines)
+                self.__lines = new_lines
+                self.__mtime = os.path.getmtime(self.__filename)
+                for task_id, task in self.__tasks.items():
+                    task.rebind(new_lines[task_id])
+                return True
+        return False
+
+
+class Pace:
+    """
+    Time of a daemon's loop: the time it is at, when it last saved last calls, and how long it waits for events
+    """
+    queue_interval = timedelta(days=1)  # the longest wait, while no event is scheduled
+    wakeup_interval_seconds = timedelta(minutes=10).total_seconds()  # overdue by more, the clock jumped (or slept)
+    saving_interval = timedelta(seconds=5)
+
+    def __init__(self, clock: Clock, sleep_interval_seconds: Optional[float] = None) -> None:
+        self.__clock = clock
+        # if set, or if there is no deadline timer, the clock is polled (required for clocks other than the system one)
+        self.__sleep_interval_seconds = sleep_interval_seconds
         self.__time = \
-            self.__checkpoint = \
-            self.__mtime = None
+            self.__checkpoint = None
+
+    def create_timer(self) -> Optional[DeadlineTimer]:
+        """unless the clock is polled. Falls back to polling, if deadline timers are not supported"""
+        if self.__sleep_interval_seconds is not None or isinstance(self.__clock, SimulatedClock):
+            return None
+        if DeadlineTimer.is_supported():
+            return DeadlineTimer()
+        self.__sleep_interval_seconds = 5
+        return None
+
+    def start(self) -> None:
+        """at the time of the clock, and at the last checkpoint (of the saving interval) as saved"""
+        self.update()
+        self.__checkpoint = datetime.fromtimestamp(
+            int(self.__time.timestamp() / self.saving_interval.total_seconds())
+            * self.saving_interval.total_seconds())
+
+    def time(self) -> datetime:
+        return self.__time
+
+    def update(self) -> None:
+        self.__time = self.__clock.time()
+
+    def advance(self, until: datetime) -> None:
+        """to the event waited for"""
+        self.__time = until
+
+    def is_saving_due(self, until: datetime) -> bool:
+        """before waiting until then"""
+        return self.__checkpoint + self.saving_interval < until
+
+    def saved(self) -> None:
+        self.__checkpoint = self.__time
+
+    def seconds_to(self, until: datetime) -> Optional[float]:
+        """left to wait, or None once the time has come. Raises WakeUpException, if overdue by too much"""
+        seconds_to_event = until.timestamp() - self.__clock.time().timestamp()
+        if seconds_to_event > 0:
+            return seconds_to_event
+        if -seconds_to_event < self.wakeup_interval_seconds:
+            return None
+        raise WakeUpException
+
+    def timeout_seconds(self, seconds_to_event: float) -> float:
+        """of a wait for the event, while the clock is polled"""
+        return min((seconds_to_event, self.__sleep_interval_seconds))
+
+
+class Cronus:
+    """
+    Runs tasks of a crontab, or of several ones: crontab files and directories of them share the file watcher,
+    the scheduler and the executor. Each crontab is re-read on its own change, and keeps its last calls
+    """
+    __is_constructed = False
+
+    def __init__(self,
+                 filename: Union[str, Iterable[str]],
+                 clock: Clock,
+                 sleep_interval_seconds: Optional[float] = None,
+                 state_filename: Optional[str] = None,
+                 executor: Optional[Executor] = None,
+                 catch_up_window: timedelta = timedelta(0),
+                 catch_up_deadline: Optional[timedelta] = None,
+                 metrics_filename: Optional[str] = None,
+                 state_directory: Optional[str] = None,
+                 parse_workers: Optional[int] = None) -> None:
+        self.__clock = clock  # workaround, because python's unittest cannot mock with lambda
+        self.__pace = Pace(clock, sleep_interval_seconds)
+        self.__paths = [filename] if isinstance(filename, str) else list(filename)
+        if state_filename and (len(self.__paths) > 1 or os.path.isdir(self.__paths[0])):
+            # each crontab would compact the shared file down to its own last calls
+            raise Exception('A state file is supported for a single crontab only, see state_directory')
+        # last calls are saved into the state file (of a single crontab), or into a file per crontab in the directory
+        self.__state_filename = state_filename
+        self.__state_directory = state_directory
+        self.__parse_workers = parse_workers  # processes to parse large crontabs in (one per CPU, if not set)
+        self.__crontabs: dict[str, Crontab] = {}
+        self.__crontab_of: dict[Task, Crontab] = {}
+        self.__changed_filenames: Optional[set[str]] = None  # to be re-read (all of them, if None)
+        self.__file_watcher: Optional[FileWatcher] = None
+        self.__timer: Optional[DeadlineTimer] = None
+        self.__scheduler = Scheduler()
+        self.__executor = executor or Executor()
+        # skipped tasks are spread over the window (most overdue first), unless skipped longer than the deadline ago
+        self.__catch_up_window = catch_up_window
+        self.__catch_up_deadline = catch_up_deadline
+        self.__catching_up: set[Task] = set()
+        # dumped on saving of last calls
+        self.__metrics = Metrics()
+        self.__metrics.histogram('cronus_spawn_seconds', self.__executor.spawn_seconds())
+        self.__metrics_filename = metrics_filename
+        self.__is_constructed = True
 
     def __del__(self) -> None:
+        if not self.__is_constructed:  # the constructor raised
+            return
         self.__write()
-        if self.__file_watching_process:
-            self.__file_watching_process.terminate()
-            self.__file_watching_process.wait(5)
+        if self.__file_watcher:
+            self.__file_watcher.close()
+            self.__file_watcher = None
+        if self.__timer:
+            self.__timer.close()
+            self.__timer = None
 
     def run(self) -> None:
-        match system := platform.system():
-            case "Linux":
-                self.__file_watching_process = subprocess.Popen(("inotifywait",
-                                                                 "--monitor",
-                                                                 "--event",
-                                                                 "CLOSE_WRITE",
-                                                                 self.__filename),
-                                                                stdout=subprocess.PIPE)
-            case "Darwin":
-                self.__file_watching_process = subprocess.Popen(("fswatch",
-                                                                 "--one-per-batch",
-                                                                 "--event",
-                                                                 "Updated",
-                                                                 self.__filename),
-                                                                stdout=subprocess.PIPE)
-            case _:
-                raise Exception(f"Unknown OS: {system}")
-
-        def enqueue_output(out: IO, _queue: queue.Queue) -> None:
-            for line in iter(out.readline, b''):
-                _queue.put(line)
-            out.close()
-
-        t = threading.Thread(target=enqueue_output,
-                             args=(self.__file_watching_process.stdout, self.__file_watching_queue))
-        t.daemon = True
-        t.start()  # MAYBE: kill in __del__
+        self.__file_watcher = FileWatcher.create(*self.__paths)
+        self.__timer = self.__pace.create_timer()
 
-        self.__update_time()
-        self.__checkpoint = self.__last_checkpoint()
+        self.__pace.start()
         while True:
             try:
-                self.__read()
-                self.__update_time()
+                with self.__metrics.measure('cronus_reload_seconds'):
+                    self.__read()
+                self.__pace.update()
+                with self.__metrics.measure('cronus_scheduling_seconds'):
+                    self.__schedule()
                 self.__run_skipped()
                 while True:
-                    next_event = self.__next_event()
-                    if next_event.datetime > self.__clock.time():
-                        self.__wait(next_event.datetime)
+                    next_event_time = self.__next_event_time()
+                    if next_event_time > self.__clock.time():
+                        self.__wait(next_event_time)
+                    next_event = self.__scheduler.pop_event()
+                    lag = self.__clock.time() - next_event.datetime
+                    self.__metrics.histogram('cronus_fire_lag_seconds').observe(max(lag.total_seconds(), 0.))
+                    self.__executor.poll()
                     for task in next_event.tasks:
-                        task.execute()
-            except (FileChangedException, WakeUpException):
+                        self.__execute(task)
+                    self.__catching_up.difference_update(next_event.tasks)
+                    with self.__metrics.measure('cronus_scheduling_seconds'):
+                        self.__scheduler.reschedule(next_event)
+            except FileChangedException:
+                continue
+            except WakeUpException:
+                self.__metrics.count('cronus_clock_jumps_total')
+                self.__scheduler.clear()
+                self.__catching_up.clear()
                 continue
             except Exception:
                 self.__del__()
                 raise
 
     def __read(self) -> None:
-        new_tasks: dict[int, Task] = {}
-        self.__mtime = os.path.getmtime(self.__filename)
-        with open(self.__filename, 'r') as file:
-            self.__lines = file.readlines()
-        for task_id in range(len(self.__lines)):
+        filenames = self.__filenames()
+        for filename in [filename for filename in self.__crontabs if filename not in filenames]:
+            self.__forget(self.__crontabs.pop(filename).tasks())
+        for filename in filenames:
+            if filename not in self.__crontabs:
+                self.__crontabs[filename] = Crontab(filename,
+                                                    self.__clock,
+                                                    self.__state_filename_of(filename),
+                                                    self.__parse_workers)
+            elif self.__changed_filenames is not None and filename not in self.__changed_filenames:
+                continue
+            crontab = self.__crontabs[filename]
             try:
-                if task := Task.from_string(self.__lines[task_id], self.__clock):
-                    new_tasks[task_id] = task
-            except Exception as exception:
-                alert(exception)
-
-        updated_tasks: dict[int, Task] = {}
-        for new_task_id, new_task in new_tasks.items():
-            if new_task_id in self.__tasks:
-                old_task = self.__tasks[new_task_id]
-                if new_task.equals(old_task):
-                    old_task.copy_last_call(new_task)
-                    updated_tasks[new_task_id] = old_task
-                else:
-                    updated_tasks[new_task_id] = new_task
+                self.__forget(crontab.read())
+            except FileNotFoundError:
+                if filename in self.__paths:
+                    raise
+                self.__forget(self.__crontabs.pop(filename).tasks())  # removed from its directory meanwhile
+                continue
+            for task in crontab.tasks():
+                self.__crontab_of[task] = crontab
+        self.__changed_filenames = set()
+
+    def __filenames(self) -> list[str]:
+        """of crontabs: given ones, and ones in given directories"""
+        filenames = []
+        for path in self.__paths:
+            if os.path.isdir(path):
+                filenames += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                              if crontab_name_pattern.match(name) and os.path.isfile(os.path.join(path, name))]
             else:
-                updated_tasks[new_task_id] = new_task
-        self.__tasks = updated_tasks
+                filenames.append(path)
+        return filenames
 
-        self.__next_events = []
+    def __state_filename_of(self, filename: str) -> Optional[str]:
+        if self.__state_directory:
+            return os.path.join(self.__state_directory, urllib.parse.quote(os.path.abspath(filename), safe=''))
+        return self.__state_filename
 
-    def __write(self) -> None:
-        if self.__tasks and self.__lines:
-            new_lines = self.__lines[:]
-            for task_id, task in self.__tasks.items():
-                new_lines[task_id] = str(task) + '\n'
-            if new_lines != self.__lines:
-                with open(self.__filename, 'w') as file:
-                    file.writelines(new_lines)
+    def __forget(self, tasks: Iterable[Task]) -> None:
+        for task in tasks:
+            self.__scheduler.remove(task)
+            self.__executor.discard(task)
+            self.__catching_up.discard(task)
+            self.__crontab_of.pop(task, None)
 
-                # while not self.__file_changed(1.): # sometimes gets stuck on start
-                #     pass
-                self.__file_changed(1.)
+    def __tasks(self) -> Iterator[Task]:
+        for crontab in self.__crontabs.values():
+            yield from crontab.tasks()
 
-                self.__clear_file_changes_queue()
-                self.__lines = new_lines
-                self.__mtime = os.path.getmtime(self.__filename)
-            self.__checkpoint = self.__time
+    def __write(self) -> None:
+        with self.__metrics.measure('cronus_persist_seconds'):
+            written_filenames = {filename for filename, crontab in self.__crontabs.items() if crontab.write()}
+        if written_filenames and self.__file_watcher:
+            # while not self.__file_watcher.wait(1.): # sometimes gets stuck on start
+            #     pass
+            changed_filenames = self.__file_watcher.wait(1.)
+
+            changed_filenames |= self.__file_watcher.wait(0)
+            self.__change(changed_filenames - written_filenames)  # other crontabs, changed meanwhile
+        self.__pace.saved()
+        if self.__metrics_filename:
+            self.__dump_metrics()
+
+    def __dump_metrics(self) -> None:
+        self.__metrics.set('cronus_crontabs', len(self.__crontabs))
+        self.__metrics.set('cronus_scheduled_tasks', len(self.__scheduler))
+        for name, value in self.__executor.metrics().items():
+            if name in ('started', 'skipped', 'deferred', 'wait_seconds_total'):
+                self.__metrics.set(f"cronus_{name.removesuffix('_total')}_total", value, 'counter')
+            else:
+                self.__metrics.set(f'cronus_{name}', value)
+        try:
+            self.__metrics.dump(self.__metrics_filename)
+        except OSError as exception:
+            alert(exception)
 
     def __run_skipped(self) -> None:
-        for task in self.__tasks.values():
-            if task.skipped():
-                task.execute()
-
-    def __next_event(self) -> Event:
-        while not self.__next_events:
-            self.__next_events = self.__determine_next_events()
-            if not self.__next_events:
-                self.__wait(self.__time + self.__queue_interval)
-        return self.__next_events.pop(0)
-
-    def __determine_next_events(self) -> list[Event]:  # TODO: simplify (remove useless cycles)
-        next_events_dic = {}
-        for task_id, task in self.__tasks.items():
-            next_events_dic[task_id] = task.calls(self.__time, self.__time + self.__queue_interval)
-        next_events_list = []
-        while True:
-            next_events_dic = {k: v for k, v in next_events_dic.items() if v}
-            if not next_events_dic:
-                break
-            next_event_time = min(v[0] for v in next_events_dic.values())
-            next_event_tasks = {}
-            for task_id in next_events_dic:
-                if next_events_dic[task_id][0] == next_event_time:
-                    # map by id in order by fix pre-midnight glitch (executing task twice)
-                    next_event_tasks[task_id] = self.__tasks[task_id]
-
-                    del next_events_dic[task_id][0]
-            next_events_list.append(Event(next_event_time, list(next_event_tasks.values())))
-        return next_events_list
-
-    def __last_checkpoint(self) -> datetime:
-        return datetime.fromtimestamp(
-            int(self.__time.timestamp() / self.__saving_interval.total_seconds())
-            * self.__saving_interval.total_seconds())
+        skipped_tasks: list[tuple[datetime, Task]] = []
+        tasks = [task for task in self.__tasks() if task not in self.__catching_up]
+        for task, missed_call in BatchEvaluator(tasks).missed_calls(self.__clock.time()):
+            if self.__catch_up_deadline is None or self.__pace.time() - missed_call <= self.__catch_up_deadline:
+                skipped_tasks.append((missed_call, task))
+        if not self.__catch_up_window:
+            for _, task in skipped_tasks:
+                self.__execute(task)
+                self.__scheduler.add(task, self.__pace.time())
+            return
+        skipped_tasks.sort(key=lambda skipped_task: skipped_task[0])
+        for i, (_, task) in enumerate(skipped_tasks):
+            self.__scheduler.call_at(task, self.__pace.time() + self.__catch_up_window * i / len(skipped_tasks))
+            self.__catching_up.add(task)
+
+    def __execute(self, task: Task) -> None:
+        self.__executor.submit(task)
+        self.__crontab_of[task].executed(task)
+
+    def __schedule(self) -> None:
+        self.__scheduler.add_all([task for task in self.__tasks() if task not in self.__scheduler], self.__pace.time())
+
+    def __next_event_time(self) -> datetime:
+        while (next_event_time := self.__scheduler.next_time()) is None:
+            self.__wait(self.__pace.time() + Pace.queue_interval)
+        return next_event_time
 
     def __wait(self, until: datetime) -> None:
-        next_checkpoint = self.__checkpoint + self.__saving_interval
-        if next_checkpoint < until:
+        if self.__pace.is_saving_due(until):
             self.__write()
         self.__sleep(until)
-        self.__time = until
+        self.__pace.advance(until)
 
     def __sleep(self, until: datetime) -> None:
-        until = until.timestamp()
-        while True:
-            seconds_to_event = until - self.__clock.time().timestamp()
-            if seconds_to_event > 0:
-                self.__watch_file(min((seconds_to_event, self.__sleep_interval_seconds)))
-            else:
-                overdue = -seconds_to_event
-                if overdue < self.__wakeup_interval_seconds:
-                    return
-                else:
-                    raise WakeUpException
+        if isinstance(self.__clock, SimulatedClock):
+            self.__clock.sleep(until)
+            return
+        if self.__changed_filenames:
+            raise FileChangedException
+        while (seconds_to_event := self.__pace.seconds_to(until)) is not None:
+            self.__watch_file(until, seconds_to_event)
+
+    def __watch_file(self, until: datetime, seconds_to_event: float) -> None:
+        if self.__timer:
+            # blocks until the event, a file change, or a change of the clock (or exit of a process, to start queued)
+            self.__timer.set(until)
+            ready = select.select([self.__file_watcher, self.__timer] + self.__executor.fds(),
+                                  [],
+                                  [],
+                                  self.__executor.polling_seconds())[0]
+            if self.__timer in ready:
+                self.__timer.clear()
+        else:
+            timeout_seconds = self.__pace.timeout_seconds(seconds_to_event)
+            if (polling_seconds := self.__executor.polling_seconds()) is not None:
+                timeout_seconds = min((timeout_seconds, polling_seconds))
+            select.select([self.__file_watcher] + self.__executor.fds(), [], [], timeout_seconds)
+        self.__executor.poll()
+        self.__change(self.__file_watcher.wait(0))
+        if self.__changed_filenames:
+            raise FileChangedException
+
+    def __change(self, filenames: set[str]) -> None:
+        if self.__changed_filenames is not None:
+            self.__changed_filenames |= filenames
 
-    def __watch_file(self, timeout_seconds: float) -> None:
-        if self.__file_changed(timeout_seconds):
-            self.__clear_file_changes_queue()
+
+class AsyncCronus:
+    """
+    Cronus on an asyncio loop. Changes of the crontab, the deadline timer and exits of commands are callbacks of
+    the loop, so that running commands take neither a thread nor polling each
+    """
+
+    def __init__(self,
+                 filename: str,
+                 clock: Clock,
+                 sleep_interval_seconds: Optional[float] = None,
+                 state_filename: Optional[str] = None,
+                 max_processes: Optional[int] = None,
+                 max_instances: int = 1,
+                 parse_workers: Optional[int] = None) -> None:
+        self.__clock = clock
+        self.__pace = Pace(clock, sleep_interval_seconds)
+        self.__filename = filename
+        self.__crontab = Crontab(filename, clock, state_filename, parse_workers)
+        self.__file_watcher: Optional[FileWatcher] = None
+        self.__timer: Optional[DeadlineTimer] = None
+        self.__scheduler = Scheduler()
+        # calls over the limit wait for the semaphore, which wakes its waiters in FIFO order
+        self.__processes = asyncio.Semaphore(max_processes) if max_processes else contextlib.nullcontext()
+        self.__max_instances = max_instances
+        self.__jobs: dict[Task, set[asyncio.Task]] = {}
+        self.__wake_up = asyncio.Event()
+        self.__file_changed = False
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        if sys.version_info < (3, 12) and hasattr(asyncio, 'PidfdChildWatcher') and self.__is_pidfd_supported():
+            # since python 3.12 it is the default, instead of a thread per process
+            child_watcher = asyncio.PidfdChildWatcher()
+            child_watcher.attach_loop(loop)
+            asyncio.set_child_watcher(child_watcher)
+        self.__file_watcher = FileWatcher.create(self.__filename)
+        loop.add_reader(self.__file_watcher.fileno(), self.__on_file_event)
+        self.__timer = self.__pace.create_timer()
+        if self.__timer:
+            loop.add_reader(self.__timer.fileno(), self.__on_deadline)
+
+        try:
+            self.__pace.start()
+            while True:
+                try:
+                    self.__read()
+                    self.__pace.update()
+                    self.__schedule()
+                    self.__run_skipped()
+                    while True:
+                        next_event_time = await self.__next_event_time()
+                        if next_event_time > self.__clock.time():
+                            await self.__wait(next_event_time)
+                        next_event = self.__scheduler.pop_event()
+                        for task in next_event.tasks:
+                            self.__execute(task)
+                        self.__scheduler.reschedule(next_event)
+                except FileChangedException:
+                    continue
+                except WakeUpException:
+                    self.__scheduler.clear()
+                    continue
+        finally:
+            await self.__close(loop)
+
+    async def __close(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.__crontab.write()
+        jobs = [job for task_jobs in self.__jobs.values() for job in task_jobs]
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        if self.__file_watcher:
+            loop.remove_reader(self.__file_watcher.fileno())
+            self.__file_watcher.close()
+            self.__file_watcher = None
+        if self.__timer:
+            loop.remove_reader(self.__timer.fileno())
+            self.__timer.close()
+            self.__timer = None
+
+    def __on_file_event(self) -> None:
+        if self.__file_watcher.read():
+            self.__file_changed = True
+            self.__wake_up.set()
+
+    def __on_deadline(self) -> None:
+        self.__timer.clear()
+        self.__wake_up.set()
+
+    def __read(self) -> None:
+        for task in self.__crontab.read():
+            self.__scheduler.remove(task)
+            for job in self.__jobs.pop(task, ()):
+                job.cancel()
+
+    async def __write(self) -> None:
+        if self.__crontab.write():
+            await self.__skip_own_change()
+        self.__pace.saved()
+
+    async def __skip_own_change(self) -> None:
+        with contextlib.suppress(asyncio.TimeoutError):
+            while not self.__file_changed:
+                self.__wake_up.clear()
+                await asyncio.wait_for(self.__wake_up.wait(), 1.)
+        await asyncio.sleep(FileWatcher.burst_seconds)
+        self.__file_changed = False
+
+    def __run_skipped(self) -> None:
+        for task, _ in BatchEvaluator(self.__crontab.tasks()).missed_calls(self.__clock.time()):
+            self.__execute(task)
+            self.__scheduler.add(task, self.__pace.time())
+
+    def __execute(self, task: Task) -> None:
+        jobs = self.__jobs.setdefault(task, set())
+        if len(jobs) >= self.__max_instances:
+            return
+        task.mark_called()
+        self.__crontab.executed(task)
+        job = asyncio.create_task(self.__run_command(task))
+        jobs.add(job)
+        job.add_done_callback(jobs.discard)
+
+    async def __run_command(self, task: Task) -> None:
+        async with self.__processes:
+            if process := await task.spawn_async():
+                try:
+                    await process.wait()
+                except asyncio.CancelledError:
+                    await terminate_async(process)
+                    raise
+
+    def __schedule(self) -> None:
+        self.__scheduler.add_all([task for task in self.__crontab.tasks() if task not in self.__scheduler],
+                                 self.__pace.time())
+
+    async def __next_event_time(self) -> datetime:
+        while (next_event_time := self.__scheduler.next_time()) is None:
+            await self.__wait(self.__pace.time() + Pace.queue_interval)
+        return next_event_time
+
+    async def __wait(self, until: datetime) -> None:
+        if self.__pace.is_saving_due(until):
+            await self.__write()
+        await self.__sleep(until)
+        self.__pace.advance(until)
+
+    async def __sleep(self, until: datetime) -> None:
+        while (seconds_to_event := self.__pace.seconds_to(until)) is not None:
+            await self.__watch_file(until, seconds_to_event)
+
+    async def __watch_file(self, until: datetime, seconds_to_event: float) -> None:
+        self.__wake_up.clear()
+        if not self.__file_changed:
+            if self.__timer:
+                self.__timer.set(until)
+                await self.__wake_up.wait()
+            else:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.__wake_up.wait(), self.__pace.timeout_seconds(seconds_to_event))
+        if self.__file_changed:
+            await asyncio.sleep(FileWatcher.burst_seconds)
+            self.__file_changed = False
             raise FileChangedException
 
-    def __file_changed(self, timeout_seconds: float) -> bool:
+    @staticmethod
+    def __is_pidfd_supported() -> bool:
         try:
-            self.__file_watching_queue.get(True, timeout_seconds)
+            os.close(os.pidfd_open(os.getpid()))
             return True
-        except queue.Empty:
+        except (AttributeError, OSError):
             return False
 
-    def __clear_file_changes_queue(self) -> None:
-        while not self.__file_watching_queue.empty():
-            self.__file_watching_queue.queue.clear()
 
-    def __update_time(self) -> None:
-        self.__time = self.__clock.time()
+def simulate(filename: Union[str, Iterable[str]],
+             _from: datetime,
+             _to: datetime,
+             output: TextIO = sys.stdout) -> None:
+    """prints calls of tasks of the crontab(s), that the daemon would make within the range. Runs and changes
+    nothing"""
+    clock = SimulatedClock(_from, _to)
+    with tempfile.TemporaryDirectory() as directory:
+        # last calls go to throwaway state files, so that crontabs are not written
+        cronus = Cronus(filename,
+                        clock,
+                        executor=DryRunExecutor(clock, output),
+                        state_directory=directory)
+        try:
+            cronus.run()
+        except SimulationFinished:
+            pass
+        del cronus
+
+
+def forecast(filename: str,
+             _from: datetime,
+             _to: datetime,
+             count: bool = False,
+             busiest: Optional[int] = None,
+             output: TextIO = sys.stdout) -> None:
+    """prints calls of tasks of the crontab within the range, by their schedules (or their number, or the busiest
+    seconds)"""
+    crontab = Crontab(filename, Clock())
+    crontab.read()
+    timeline = Timeline(crontab.tasks())
+    if count:
+        print(timeline.count(_from, _to), file=output)
+    elif busiest:
+        for _time, calls in timeline.busiest(_from, _to, busiest):
+            print(f"{_time:%Y-%m-%d %H:%M:%S} {calls}", file=output)
+    else:
+        for event in timeline.calls(_from, _to):
+            for task in event.tasks:
+                print(f"{event.datetime:%Y-%m-%d %H:%M:%S} {task.definition().strip()}", file=output)
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='A crontab, that also executes jobs skipped while the PC was off')
+    parser.add_argument('crontab', nargs='?')
+    parser.add_argument('state_file', nargs='?', help='where to save last calls, instead of the crontab')
+    parser.add_argument('--crontabs', nargs='+', metavar='PATH',
+                        help='crontabs, or directories of them, to run in one daemon (instead of the crontab)')
+    parser.add_argument('--state-dir', help='where to save last calls, a file per crontab, instead of the crontabs')
+    parser.add_argument('--max-processes', type=int, help='how many commands may run at once')
+    parser.add_argument('--max-instances', type=int, default=1, help='how many instances of a job may run at once')
+    parser.add_argument('--catch-up-window', type=float, default=0, help='seconds to spread skipped jobs over')
+    parser.add_argument('--catch-up-deadline', type=float, help='seconds, after which skipped jobs are not run')
+    parser.add_argument('--max-load', type=float, help='load average per CPU, over which jobs are deferred')
+    parser.add_argument('--max-cpu', type=float, help='CPU usage (percent), over which jobs are deferred')
+    parser.add_argument('--max-memory', type=float, help='memory usage (percent), over which jobs are deferred')
+    parser.add_argument('--max-delay', type=float, default=300, help='seconds, for which a job may be deferred')
+    parser.add_argument('--metrics-file', help='where to dump metrics in the Prometheus text format')
+    parser.add_argument('--parse-workers', type=int,
+                        help='processes to parse large crontabs in (one per CPU by default, 1 to parse serially)')
+    parser.add_argument('--simulate', nargs=2, metavar=('FROM', 'TO'), type=datetime.fromisoformat,
+                        help='print calls of jobs within the range (f.e. "2024-01-01 00:00"), without running them')
+    parser.add_argument('--forecast', nargs=2, metavar=('FROM', 'TO'), type=datetime.fromisoformat,
+                        help='print calls of jobs within the range by their schedules')
+    parser.add_argument('--count', action='store_true', help='with --forecast: print the number of calls only')
+    parser.add_argument('--busiest', type=int, metavar='N', help='with --forecast: print N seconds with most calls')
+    parser.add_argument('--asyncio', action='store_true',
+                        help='run on an asyncio loop (no catch-up, no metrics, no deferring)')
+    arguments = parser.parse_args()
+    if (arguments.crontab is None) == (arguments.crontabs is None):
+        parser.error('either a crontab or --crontabs is required')
+    if (arguments.crontabs or os.path.isdir(arguments.crontab)) \
+            and (arguments.state_file or arguments.asyncio or arguments.forecast):
+        parser.error('several crontabs (--crontabs, or a directory) are not supported with a state file, --asyncio, '
+                     '--forecast')
+    if arguments.state_dir and arguments.state_file:
+        parser.error('either a state file or --state-dir is supported')
+    is_load_aware = any(limit is not None for limit in (arguments.max_load, arguments.max_cpu, arguments.max_memory))
+    if arguments.asyncio and (arguments.catch_up_window or arguments.catch_up_deadline is not None
+                              or arguments.metrics_file or is_load_aware or arguments.state_dir):
+        parser.error('catch-up, metrics, load options and --state-dir are not supported with --asyncio')
+    if arguments.forecast:
+        forecast(arguments.crontab, *arguments.forecast, arguments.count, arguments.busiest)
+        sys.exit()
+    if arguments.simulate:
+        simulate(arguments.crontabs or arguments.crontab, *arguments.simulate)
+        sys.exit()
     try:
-        Cronus(sys.argv[1], Clock()).run()
+        if arguments.asyncio:
+            asyncio.run(AsyncCronus(arguments.crontab,
+                                    Clock(),
+                                    state_filename=arguments.state_file,
+                                    max_processes=arguments.max_processes,
+                                    max_instances=arguments.max_instances,
+                                    parse_workers=arguments.parse_workers).run())
+        else:
+            Cronus(arguments.crontabs or arguments.crontab,
+                   Clock(),
+                   state_filename=arguments.state_file,
+                   executor=Executor(arguments.max_processes,
+                                     arguments.max_instances,
+                                     admission=Admission(arguments.max_load,
+                                                         arguments.max_cpu,
+                                                         arguments.max_memory,
+                                                         arguments.max_delay) if is_load_aware else None),
+                   catch_up_window=timedelta(seconds=arguments.catch_up_window),
+                   catch_up_deadline=timedelta(seconds=arguments.catch_up_deadline)
+                   if arguments.catch_up_deadline is not None else None,
+                   metrics_filename=arguments.metrics_file,
+                   state_directory=arguments.state_dir,
+                   parse_workers=arguments.parse_workers).run()
     except (KeyboardInterrupt, SystemExit):
         raise
     except BaseException as base_exception:
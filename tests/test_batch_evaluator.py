@@ -0,0 +1,57 @@
+from __future__ import annotations
+from datetime import datetime
+import unittest
+
+from unittest_data_provider import data_provider
+
+from cronus import BatchEvaluator, SimulatedClock, Task, numpy
+
+lines = ('* * * * 0 0  echo hourly #2020-12-31 12:00:00',
+         '* * * * 0 0  echo hourly too #2021-01-01 08:00:00',
+         '* * 7 12 0 0  backup --weekly #2020-12-01 00:00:00',
+         '* 1,15 * 3 */20 30  report #2021-01-01 00:00:00',
+         '* * 1-5 9-17 */15 0  check #2020-12-31 17:45:00',
+         '2 29 * 0 0 0  leap #2020-02-29 00:00:00',
+         '2 29 1 0 0 0  leap on monday #2010-01-01 00:00:00',
+         '12 31 * 23 59 59  new year eve #2030-01-01 00:00:00')
+
+
+class ShortSightedEvaluator(BatchEvaluator):
+    horizon_months = 12
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    @staticmethod
+    def times_provider() -> list[tuple[datetime, bool]]:
+        return [(_time, vectorized)
+                for _time in (datetime(2021, 1, 1, 8),
+                              datetime(2021, 1, 1, 9, 14, 59, 500),
+                              datetime(2021, 3, 14, 12, 0, 1),
+                              datetime(2024, 2, 29),
+                              datetime(2031, 12, 31, 23, 59, 59))
+                for vectorized in (False, True)]
+
+    @data_provider(times_provider)
+    def test_next_calls(self, _time: datetime, vectorized: bool) -> None:
+        tasks = self.__tasks(_time)
+        assert BatchEvaluator(tasks, vectorized).next_calls(_time) \
+               == [(task, next(task.calls(_time), None)) for task in tasks]
+
+    @data_provider(times_provider)
+    def test_missed_calls(self, _time: datetime, vectorized: bool) -> None:
+        tasks = self.__tasks(_time)
+        assert BatchEvaluator(tasks, vectorized).missed_calls(_time) \
+               == [(task, missed_call) for task in tasks if (missed_call := task.missed_call())]
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_horizon(self) -> None:
+        # leap days on mondays are decades apart: searched by tasks past the months matched at once
+        tasks = self.__tasks(datetime(2021, 1, 1))
+        evaluator = ShortSightedEvaluator(tasks)
+        assert dict(evaluator.next_calls(datetime(2021, 1, 1)))[tasks[6]] == datetime(2044, 2, 29)
+        assert dict(evaluator.missed_calls(datetime(2021, 1, 1)))[tasks[6]] == datetime(2016, 2, 29)
+
+    @staticmethod
+    def __tasks(_time: datetime) -> list[Task]:
+        clock = SimulatedClock(_time)
+        return [task for line in lines if (task := Task.from_string(line, clock))]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from datetime import datetime
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from cronus import Crontab, SimulatedClock, Task
+
+
+class EagerCrontab(Crontab):
+    parallel_lines = 2
+
+
+class TestCrontab(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, 'crontab')
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_keeping_tasks_of_shifted_lines(self) -> None:
+        _crontab = self.__crontab('* * * * 0 0  echo a #2020-12-31 12:00:00\n',
+                                  '* * * * 30 0  echo b #2020-12-31 12:30:00\n')
+        a, b = _crontab.tasks()
+        a.update_last_call(datetime(2021, 1, 1))
+        removed_tasks = self.__read(_crontab,
+                                    '# a comment\n',
+                                    '* * * * 30 0  echo b #2020-12-31 12:30:00\n',
+                                    '* * * * 0 0  echo a #2020-12-31 12:00:00\n')
+        assert removed_tasks == []
+        assert list(_crontab.tasks()) == [b, a]
+        assert a.last_call() == datetime(2021, 1, 1)
+
+    def test_keeping_tasks_of_duplicate_lines(self) -> None:
+        line = '* * * * 0 0  echo a #2020-12-31 12:00:00\n'
+        _crontab = self.__crontab(line, line)
+        first, second = _crontab.tasks()
+        assert first is not second
+        assert self.__read(_crontab, '# a comment\n', line) == [second]
+        assert list(_crontab.tasks()) == [first]
+
+    def test_keeping_task_of_changed_last_call(self) -> None:
+        _crontab = self.__crontab('* * * * 0 0  echo a #2020-12-31 12:00:00\n')
+        task, = _crontab.tasks()
+        assert self.__read(_crontab, '* * * * 0 0  echo a #2021-01-01 00:00:00\n') == []
+        assert list(_crontab.tasks()) == [task]
+        assert task.last_call() == datetime(2021, 1, 1)
+        self.__read(_crontab, '* * * * 0 0  echo a #2020-01-01 00:00:00\n')  # an older one is ignored
+        assert list(_crontab.tasks()) == [task]
+        assert task.last_call() == datetime(2021, 1, 1)
+
+    def test_reparsing_failed_lines(self) -> None:
+        with unittest.mock.patch('cronus.alert') as alert:
+            _crontab = self.__crontab('* * * * * wrong\n')
+            self.__read(_crontab, '* * * * * wrong\n')
+        assert alert.call_count == 2
+        assert list(_crontab.tasks()) == []
+        self.__read(_crontab, '* * * * * *  fixed #2020-12-31 12:00:00\n')
+        assert [str(task) for task in _crontab.tasks()] == ['* * * * * *  fixed #2020-12-31 12:00:00']
+
+    def test_parsing_in_parallel(self) -> None:
+        lines = [f"* * * * {line_id % 60} 0  echo {line_id} #2020-12-31 12:00:00\n" if line_id % 7
+                 else '# a comment\n'
+                 for line_id in range(100)]
+        lines[10] = '* * * * * wrong\n'
+        lines[50] = '2 30 * 0 0 0  never\n'
+        lines[90] = '* * * * * * \'unclosed\n'
+        clock = SimulatedClock(datetime(2021, 1, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'crontab')
+            with open(filename, 'w') as file:
+                file.writelines(lines)
+            results = []
+            for _crontab in (Crontab(filename, clock, parse_workers=1), EagerCrontab(filename, clock, parse_workers=2)):
+                with unittest.mock.patch('cronus.alert') as alert:
+                    _crontab.read()
+                results.append(([str(task) for task in _crontab.tasks()],
+                                [str(call.args[0]) for call in alert.call_args_list]))
+        (tasks, errors), (parallel_tasks, parallel_errors) = results
+        assert parallel_tasks == tasks
+        assert len(tasks) == len([line for line in lines if not line.startswith('#')]) - 3
+        assert parallel_errors == errors
+        assert len(errors) == 3
+        assert 'wrong' in errors[0] and 'never' in errors[1] and 'unclosed' in errors[2]
+
+    def __crontab(self, *lines: str) -> Crontab:
+        _crontab = Crontab(self.__filename, SimulatedClock(datetime(2021, 1, 1)), parse_workers=1)
+        self.__read(_crontab, *lines)
+        return _crontab
+
+    def __read(self, _crontab: Crontab, *lines: str) -> list[Task]:
+        with open(self.__filename, 'w') as file:
+            file.writelines(lines)
+        return _crontab.read()
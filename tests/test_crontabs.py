@@ -0,0 +1,99 @@
+from __future__ import annotations
+from datetime import datetime
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+
+from cronus import Clock, Cronus, DryRunExecutor, simulate
+
+stop = False
+
+
+class Stopped(Exception):
+    pass
+
+
+class StoppableClock(Clock):
+    def time(self) -> datetime:
+        if stop:
+            raise Stopped  # the daemon saves last calls on an exception
+        return super().time()
+
+
+class TestCrontabs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__crontabs = self.__path('cronus.d')
+        os.mkdir(self.__crontabs)
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_simulating(self) -> None:
+        self.__write('cronus.d/team-a', '* * * * 0 0  echo a\n')
+        self.__write('cronus.d/team-b', '* * * 12 0 0  echo b\n')
+        self.__write('cronus.d/team-b.swp', '* * * * * *  echo swap\n')
+        self.__write('cronus.d/.hidden', '* * * * * *  echo hidden\n')
+        self.__write('crontab', '* * * 6 0 0  echo c\n')
+        output = io.StringIO()
+        simulate([self.__crontabs, self.__path('crontab')], datetime(2021, 1, 1, 1), datetime(2021, 1, 2, 1), output)
+        lines = output.getvalue().splitlines()
+        assert '2021-01-01 06:00:00 * * * 6 0 0  echo c' in lines
+        assert '2021-01-01 12:00:00 * * * 12 0 0  echo b' in lines
+        # new tasks count as called at the start, and the end of the range is excluded
+        assert len([line for line in lines if line.endswith('echo a')]) == 23
+        assert not any('swap' in line or 'hidden' in line for line in lines)
+        assert sorted(os.listdir(self.__crontabs)) == ['.hidden', 'team-a', 'team-b', 'team-b.swp']
+
+    def test_rejecting_shared_state_file(self) -> None:
+        self.__write('crontab', '* * * 6 0 0  echo c\n')
+        for paths in (self.__crontabs, [self.__path('crontab'), self.__crontabs]):
+            with self.assertRaises(Exception):
+                Cronus(paths, Clock(), state_filename=self.__path('state'))
+
+    def test_reloading(self) -> None:
+        global stop
+        stop = False
+        self.__write('cronus.d/team-a', '* * * * * *  echo a\n')
+        state_directory = self.__path('state')
+        os.mkdir(state_directory)
+        output = io.StringIO()
+        cronus = Cronus(self.__crontabs,
+                        StoppableClock(),
+                        executor=DryRunExecutor(Clock(), output),
+                        state_directory=state_directory)
+
+        def run() -> None:
+            with contextlib.suppress(Stopped):
+                cronus.run()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        try:
+            time.sleep(1.5)
+            self.__write('cronus.d/team-b', '* * * * * *  echo b\n')
+            time.sleep(1.5)
+            assert output.getvalue().splitlines()[-1].endswith('echo b')
+            os.remove(self.__path('cronus.d/team-a'))
+            time.sleep(0.5)
+            calls = len(output.getvalue().splitlines())
+            time.sleep(1.5)
+            lines = output.getvalue().splitlines()[calls:]
+            assert lines and all(line.endswith('echo b') for line in lines)
+        finally:
+            stop = True
+            thread.join()
+        # a file per crontab: the removed one may not have been saved
+        assert urllib.parse.quote(self.__path('cronus.d/team-b'), safe='') in os.listdir(state_directory)
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.__directory.name, name)
+
+    def __write(self, name: str, content: str) -> None:
+        with open(self.__path(name), 'w') as file:
+            file.write(content)
@@ -3,12 +3,13 @@ import unittest.mock
 from datetime import datetime, timedelta
 # from dateutil.parser import parse
 from typing import List
+import asyncio
 import platform
 import threading
 import time
 import os
 
-from cronus import Cronus, Clock
+from cronus import AsyncCronus, Cronus, Clock
 
 
 sandbox_dir = os.path.abspath('__sandbox')
@@ -151,15 +152,17 @@ class TestCronus(unittest.TestCase):
         thread.start()
         return thread
 
-    @staticmethod
-    def __run_daemon() -> None:
+    def __run_daemon(self) -> None:
         global stop
         stop = False
         try:
-            Cronus(crontab, MockClock(), 0.01).run()
+            self.run_cronus()
         except SystemExit:
             pass
 
+    def run_cronus(self) -> None:
+        Cronus(crontab, MockClock(), 0.01).run()
+
     def __assert_events(self, expected_events: dict) -> None:
         for _time, expected_events in sorted(expected_events.items(), key=lambda x: x[0]):
             _time = self.__parse_time(_time)
@@ -244,3 +247,12 @@ class TestCronus(unittest.TestCase):
     @staticmethod
     def __normalize_events(events: List[str]) -> List[str]:
         return [event + '\n' for event in events]
+
+
+class TestAsyncCronus(TestCronus):
+    """
+    The same scenario for the asyncio daemon
+    """
+
+    def run_cronus(self) -> None:
+        asyncio.run(AsyncCronus(crontab, MockClock(), 0.01).run())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+import select
+import time
+import unittest
+
+from cronus import DeadlineTimer
+
+
+@unittest.skipUnless(DeadlineTimer.is_supported(), "timerfd is Linux-only")
+class TestDeadlineTimer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__timer = DeadlineTimer()
+
+    def tearDown(self) -> None:
+        self.__timer.close()
+
+    def test_waking_up_at_deadline(self) -> None:
+        start = time.monotonic()
+        self.__timer.set(datetime.now() + timedelta(milliseconds=100))
+        assert not select.select([self.__timer], [], [], 0.05)[0]
+        assert select.select([self.__timer], [], [], 1)[0]
+        assert 0.09 < time.monotonic() - start < 0.5
+        self.__timer.clear()
+        assert not select.select([self.__timer], [], [], 0)[0]
+
+    def test_waking_up_at_passed_deadline(self) -> None:
+        self.__timer.set(datetime.now() - timedelta(minutes=1))
+        assert select.select([self.__timer], [], [], 0.1)[0]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import time
+import unittest
+
+from cronus import Admission, Clock, Executor, Task
+
+
+class TestExecutor(unittest.TestCase):
+    def test_limiting_instances_of_task(self) -> None:
+        executor = Executor(max_instances=1)
+        task = self.__task('sleep 0.2')
+        executor.submit(task)
+        executor.submit(task)
+        assert executor.metrics()['running'] == 1
+        assert executor.metrics()['skipped'] == 1
+        time.sleep(0.3)
+        executor.submit(task)
+        assert executor.metrics()['started'] == 2
+
+    def test_queueing_over_limit_of_processes(self) -> None:
+        executor = Executor(max_processes=1)
+        first = self.__task('sleep 0.2')
+        second = self.__task('sleep 0.2 && true')
+        executor.submit(first)
+        executor.submit(second)
+        assert executor.metrics()['running'] == 1
+        assert executor.metrics()['queue_depth'] == 1
+        assert executor.fds() or executor.polling_seconds()
+        time.sleep(0.3)
+        executor.poll()
+        metrics = executor.metrics()
+        assert metrics['running'] == 1
+        assert metrics['queue_depth'] == 0
+        assert metrics['started'] == 2
+        assert metrics['wait_seconds_max'] >= 0.2
+
+    def test_queueing_fairly(self) -> None:
+        executor = Executor(max_processes=1, max_instances=3)
+        frequent = self.__task('sleep 0.1')
+        rare = self.__task('sleep 0.1 && true')
+        for _ in range(4):
+            executor.submit(frequent)
+        executor.submit(rare)
+        # the frequent task holds no more places, than instances it may start
+        assert executor.metrics()['skipped'] == 1
+        assert executor.metrics()['queue_depth'] == 3
+        for _ in range(3):
+            time.sleep(0.15)
+            executor.poll()
+        assert executor.metrics()['queue_depth'] == 0
+
+    def test_discarding_task(self) -> None:
+        executor = Executor(max_processes=1)
+        running = self.__task('sleep 5')
+        queued = self.__task('sleep 5 && true')
+        executor.submit(running)
+        executor.submit(queued)
+        executor.discard(queued)
+        executor.discard(running)
+        assert executor.metrics()['running'] == 0
+        assert executor.metrics()['queue_depth'] == 0
+
+    def test_deferring_on_saturated_host(self) -> None:
+        admission = SaturatedAdmission(retry_seconds=0.1)
+        executor = Executor(admission=admission)
+        low = self.__task('true # @max-delay=1')
+        high = self.__task('true # @priority=1')
+        executor.submit(low)
+        executor.submit(high)
+        executor.submit(low)
+        metrics = executor.metrics()
+        assert metrics['started'] == 1
+        assert metrics['deferred'] == 1
+        assert metrics['skipped'] == 1  # its instance is deferred
+        assert metrics['deferred_depth'] == 1
+        assert 0 < executor.polling_seconds() <= 0.15
+        time.sleep(0.2)
+        executor.poll()
+        assert executor.metrics()['deferred_depth'] == 1  # still saturated
+        admission.saturated = False
+        time.sleep(executor.polling_seconds())
+        executor.poll()
+        assert executor.metrics()['deferred_depth'] == 0
+        assert executor.metrics()['started'] == 2
+        assert executor.metrics()['wait_seconds_max'] >= 0.2
+
+    def test_deferring_for_max_delay(self) -> None:
+        executor = Executor(admission=SaturatedAdmission(max_delay_seconds=0.2, retry_seconds=5))
+        first = self.__task('true')
+        second = self.__task('true # @max-delay=60')
+        executor.submit(first)
+        executor.submit(second)
+        assert executor.polling_seconds() <= 0.2
+        time.sleep(0.2)
+        executor.poll()
+        assert executor.metrics()['started'] == 1
+        assert executor.metrics()['deferred_depth'] == 1
+        executor.discard(second)
+        assert executor.metrics()['deferred_depth'] == 0
+        assert executor.polling_seconds() is None
+
+    @staticmethod
+    def __task(command: str) -> Task:
+        return Task.from_string('* * * * * * ' + command, Clock())
+
+
+class SaturatedAdmission(Admission):
+    saturated = True
+
+    def is_saturated(self) -> bool:
+        return self.saturated
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+import unittest
+
+from cronus import FileWatcher, InotifyFileWatcher, ProcessFileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = self.__path('crontab')
+        self.__write(self.__filename)
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    @unittest.skipUnless(InotifyFileWatcher.is_supported(), "inotify is Linux-only")
+    def test_inotify(self) -> None:
+        self.__test(InotifyFileWatcher(self.__filename))
+
+    @unittest.skipUnless(InotifyFileWatcher.is_supported() and shutil.which('inotifywait'), "needs inotifywait")
+    def test_inotifywait(self) -> None:
+        self.__test(ProcessFileWatcher(self.__filename))
+
+    @unittest.skipUnless(InotifyFileWatcher.is_supported(), "inotify is Linux-only")
+    def test_several_paths(self) -> None:
+        os.mkdir(self.__path('cronus.d'))
+        self.__write(self.__path('cronus.d/team'))
+        watcher = FileWatcher.create(self.__filename, self.__path('cronus.d'))
+        try:
+            self.__write(self.__path('another'))
+            assert not watcher.wait(0.1)
+
+            self.__write(self.__filename)
+            self.__write(self.__path('cronus.d/new'))
+            assert watcher.wait(1) == {self.__filename, self.__path('cronus.d/new')}
+
+            os.remove(self.__path('cronus.d/team'))
+            assert watcher.wait(1) == {self.__path('cronus.d/team')}
+        finally:
+            watcher.close()
+
+    def __test(self, watcher: FileWatcher) -> None:
+        try:
+            assert not watcher.wait(0.1)
+
+            self.__write(self.__filename)
+            assert watcher.wait(1)
+            assert not watcher.wait(0.1)
+
+            self.__write(self.__path('crontab.swp'))
+            os.rename(self.__path('crontab.swp'), self.__filename)
+            assert watcher.wait(1)
+
+            self.__write(self.__path('another'))
+            assert not watcher.wait(0.1)
+
+            for _ in range(10):
+                self.__write(self.__filename)
+            assert watcher.wait(1)
+            assert not watcher.wait(0.1)
+        finally:
+            watcher.close()
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.__directory.name, name)
+
+    @staticmethod
+    def __write(filename: str) -> None:
+        with open(filename, 'w') as file:
+            file.write('* * * * * * echo\n')
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import os
+import tempfile
+import unittest
+
+from cronus import Histogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram(self) -> None:
+        histogram = Histogram()
+        for seconds in (0.0005, 0.001, 0.3, 1000.):
+            histogram.observe(seconds)
+        lines = histogram.lines('lag')
+        assert lines[0] == 'lag_bucket{le="0.001"} 2'
+        assert 'lag_bucket{le="0.5"} 3' in lines
+        assert 'lag_bucket{le="600.0"} 3' in lines
+        assert 'lag_bucket{le="+Inf"} 4' in lines
+        assert lines[-1] == 'lag_count 4'
+
+    def test_text(self) -> None:
+        metrics = Metrics()
+        with metrics.measure('reload_seconds'):
+            pass
+        metrics.count('jumps_total')
+        metrics.count('jumps_total', 2)
+        metrics.set('tasks', 5)
+        lines = metrics.text().splitlines()
+        assert '# TYPE reload_seconds histogram' in lines
+        assert 'reload_seconds_count 1' in lines
+        assert lines[-4:] == ['# TYPE jumps_total counter', 'jumps_total 3', '# TYPE tasks gauge', 'tasks 5']
+
+    def test_sharing_histogram(self) -> None:
+        metrics = Metrics()
+        histogram = Histogram()
+        assert metrics.histogram('spawn_seconds', histogram) is histogram
+        histogram.observe(0.1)
+        assert 'spawn_seconds_count 1' in metrics.text().splitlines()
+
+    def test_dumping(self) -> None:
+        metrics = Metrics()
+        metrics.set('tasks', 1)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'cronus.prom')
+            metrics.dump(filename)
+            with open(filename) as file:
+                assert file.read() == metrics.text()
+            assert os.listdir(directory) == ['cronus.prom']
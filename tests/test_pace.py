@@ -0,0 +1,27 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+import unittest
+
+from cronus import Pace, SimulatedClock, WakeUpException
+
+
+class TestPace(unittest.TestCase):
+    def test_saving(self) -> None:
+        pace = Pace(SimulatedClock(datetime(2021, 1, 1, 12, 0, 7)))
+        pace.start()
+        assert pace.time() == datetime(2021, 1, 1, 12, 0, 7)
+        assert not pace.is_saving_due(datetime(2021, 1, 1, 12, 0, 10))  # saved at the checkpoint of 12:00:05
+        assert pace.is_saving_due(datetime(2021, 1, 1, 12, 0, 10, 1))
+        pace.advance(datetime(2021, 1, 1, 12, 0, 30))
+        pace.saved()
+        assert not pace.is_saving_due(datetime(2021, 1, 1, 12, 0, 35))
+
+    def test_waiting(self) -> None:
+        clock = SimulatedClock(datetime(2021, 1, 1, 12))
+        pace = Pace(clock, 5.)
+        assert pace.create_timer() is None
+        assert pace.seconds_to(datetime(2021, 1, 1, 12, 0, 30)) == 30.
+        assert pace.timeout_seconds(30.) == 5.
+        assert pace.seconds_to(datetime(2021, 1, 1, 11, 55)) is None  # late, but not by much
+        with self.assertRaises(WakeUpException):
+            pace.seconds_to(datetime(2021, 1, 1, 12) - timedelta(seconds=Pace.wakeup_interval_seconds))
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from dateutil.parser import parse
+import unittest
+
+from cronus import Clock, Scheduler, Task
+
+
+class TestScheduler(unittest.TestCase):
+    __command = 'echo > /dev/null'
+
+    def test_coalescing_tasks_of_same_second(self) -> None:
+        every_5s = self.__task('* * * * * */5')
+        every_3s = self.__task('* * * * * */3')
+        scheduler = self.__scheduler(every_5s, every_3s)
+        events = []
+        for _ in range(5):
+            event = scheduler.pop_event()
+            events.append((event.datetime, event.tasks))
+            scheduler.reschedule(event)
+        assert events == [(parse('2017-11-18 13:33:00'), [every_5s, every_3s]),
+                          (parse('2017-11-18 13:33:03'), [every_3s]),
+                          (parse('2017-11-18 13:33:05'), [every_5s]),
+                          (parse('2017-11-18 13:33:06'), [every_3s]),
+                          (parse('2017-11-18 13:33:09'), [every_3s])]
+        assert len(scheduler) == 2
+
+    def test_removing_task(self) -> None:
+        every_5s = self.__task('* * * * * */5')
+        every_3s = self.__task('* * * * * */3')
+        scheduler = self.__scheduler(every_5s, every_3s)
+        scheduler.remove(every_3s)
+        event = scheduler.pop_event()
+        scheduler.reschedule(event)
+        assert event.tasks == [every_5s]
+        assert scheduler.next_time() == parse('2017-11-18 13:33:05')
+        assert len(scheduler) == 1
+
+    def test_readding_task(self) -> None:
+        every_5s = self.__task('* * * * * */5')
+        scheduler = self.__scheduler(every_5s)
+        scheduler.add(every_5s, parse('2017-11-18 13:32:59.5'))
+        scheduler.add(every_5s, parse('2017-11-18 13:33:01'))
+        assert every_5s in scheduler
+        assert len(scheduler) == 1
+        assert scheduler.pop_event().tasks == [every_5s]
+        assert scheduler.pop_event() is None
+
+    def test_calling_at_given_time(self) -> None:
+        every_5s = self.__task('* * * * * */5')
+        every_3s = self.__task('* * * * * */3')
+        scheduler = self.__scheduler(every_5s, every_3s)
+        scheduler.call_at(every_5s, parse('2017-11-18 13:32:59.75'))
+        scheduler.call_at(every_3s, parse('2017-11-18 13:33:01'))  # called at 13:33:00 anyway
+        events = []
+        for _ in range(3):
+            event = scheduler.pop_event()
+            events.append((event.datetime, event.tasks))
+            scheduler.reschedule(event)
+        assert events == [(parse('2017-11-18 13:32:59.75'), [every_5s]),
+                          (parse('2017-11-18 13:33:00'), [every_5s, every_3s]),
+                          (parse('2017-11-18 13:33:03'), [every_3s])]
+
+    def test_compacting_heap(self) -> None:
+        tasks = [self.__task(f'* * * * {minute} */5') for minute in range(10)]
+        scheduler = self.__scheduler(*tasks)
+        for _ in range(100):
+            for task in tasks:
+                scheduler.call_at(task, parse('2017-11-18 13:32:59.75'))
+                scheduler.add(task, parse('2017-11-18 13:32:59.5'))
+            assert scheduler.heap_size() <= 2 * len(tasks)
+        for task in tasks[1:]:
+            scheduler.remove(task)
+        assert scheduler.heap_size() <= 2
+        assert len(scheduler) == 1
+        assert scheduler.pop_event().tasks == [tasks[0]]
+        assert scheduler.next_time() is None
+
+    def test_empty(self) -> None:
+        scheduler = Scheduler()
+        assert scheduler.next_time() is None
+        assert scheduler.pop_event() is None
+
+    def __scheduler(self, *tasks: Task) -> Scheduler:
+        scheduler = Scheduler()
+        for task in tasks:
+            scheduler.add(task, parse('2017-11-18 13:32:59.5'))
+        return scheduler
+
+    def __task(self, schedule: str) -> Task:
+        return Task.from_string(schedule + ' ' + self.__command + ' #2000-01-01 00:00:00', Clock())
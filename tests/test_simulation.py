@@ -0,0 +1,67 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+import io
+import os
+import tempfile
+import unittest
+
+from cronus import Cronus, DryRunExecutor, SimulatedClock, SimulationFinished, simulate
+
+
+class TestSimulation(unittest.TestCase):
+    def test_clock(self) -> None:
+        clock = SimulatedClock(datetime(2021, 1, 1), datetime(2021, 1, 2))
+        clock.sleep(datetime(2021, 1, 1, 12))
+        assert clock.time() == datetime(2021, 1, 1, 12)
+        clock.sleep(datetime(2021, 1, 1))
+        assert clock.time() == datetime(2021, 1, 1, 12)
+        with self.assertRaises(SimulationFinished):
+            clock.sleep(datetime(2021, 1, 2))
+
+    def test_simulating(self) -> None:
+        content = ('* * * * 0 0  echo hourly #2020-12-31 12:00:00\n'
+                   '* * 7 12 0 0  backup --weekly\n'
+                   '# * * * * * *  echo commented\n')
+        with tempfile.TemporaryDirectory() as directory:
+            crontab = os.path.join(directory, 'crontab')
+            with open(crontab, 'w') as file:
+                file.write(content)
+            output = io.StringIO()
+            simulate(crontab, datetime(2021, 1, 1), datetime(2021, 1, 8), output)
+            with open(crontab, 'r') as file:
+                assert file.read() == content
+            assert os.listdir(directory) == ['crontab']
+
+        lines = output.getvalue().splitlines()
+        assert lines[0] == '2021-01-01 00:00:00 * * * * 0 0  echo hourly'  # skipped
+        assert lines[1] == '2021-01-01 01:00:00 * * * * 0 0  echo hourly'
+        assert '2021-01-03 12:00:00 * * 7 12 0 0  backup --weekly' in lines
+        assert lines[-1] == '2021-01-07 23:00:00 * * * * 0 0  echo hourly'  # the end of the range is excluded
+        assert len(lines) == 1 + 7 * 24
+        times = [line[:19] for line in lines]
+        assert times == sorted(times)
+
+    def test_catching_up(self) -> None:
+        content = ('* * * * 0 0  echo hourly #2020-12-31 12:00:00\n'
+                   '* * * 12 0 0  echo noon #2020-12-30 12:00:00\n'
+                   '7 1 * 0 0 0  echo yearly #2019-06-01 00:00:00\n')
+        with tempfile.TemporaryDirectory() as directory:
+            crontab = os.path.join(directory, 'crontab')
+            with open(crontab, 'w') as file:
+                file.write(content)
+            clock = SimulatedClock(datetime(2021, 1, 1, 0, 0, 30), datetime(2021, 1, 1, 2))
+            output = io.StringIO()
+            cronus = Cronus(crontab,
+                            clock,
+                            executor=DryRunExecutor(clock, output),
+                            catch_up_window=timedelta(minutes=30),
+                            catch_up_deadline=timedelta(days=1),
+                            state_directory=directory)
+            with self.assertRaises(SimulationFinished):
+                cronus.run()
+            del cronus
+
+        # the yearly call was missed too long ago; the others are spread over the window, most overdue first
+        assert output.getvalue().splitlines() == ['2021-01-01 00:00:30 * * * 12 0 0  echo noon',
+                                                  '2021-01-01 00:15:30 * * * * 0 0  echo hourly',
+                                                  '2021-01-01 01:00:00 * * * * 0 0  echo hourly']
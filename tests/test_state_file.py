@@ -0,0 +1,75 @@
+from __future__ import annotations
+from dateutil.parser import parse
+import os
+import tempfile
+import unittest
+
+from cronus import Clock, StateFile, Task
+
+
+class TestStateFile(unittest.TestCase):
+    __command = 'echo > /dev/null'
+
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, 'crontab.state')
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_restoring_saved_last_calls(self) -> None:
+        every_5s = self.__task('* * * * * */5', '2017-11-18 13:33:05')
+        every_3s = self.__task('* * * * * */3', '2017-11-18 13:33:03')
+        StateFile(self.__filename).save([every_5s, every_3s])
+
+        restored_5s = self.__task('* * * * * */5', '2017-11-18 00:00:00')
+        restored_3s = self.__task('* * * * * */3', '2017-11-19 00:00:00')
+        state = StateFile(self.__filename)
+        state.restore(restored_5s)
+        state.restore(restored_3s)
+        assert restored_5s.last_call() == parse('2017-11-18 13:33:05')
+        assert restored_3s.last_call() == parse('2017-11-19 00:00:00')  # newer inline last call is kept
+
+    def test_appending_only_changed_last_calls(self) -> None:
+        task = self.__task('* * * * * */5', '2017-11-18 13:33:05')
+        state = StateFile(self.__filename)
+        state.save([task])
+        state.save([task])
+        task.update_last_call(parse('2017-11-18 13:33:10'))
+        state.save([task])
+        assert len(self.__read_lines()) == 2
+
+        restored = self.__task('* * * * * */5', '2017-11-18 00:00:00')
+        StateFile(self.__filename).restore(restored)
+        assert restored.last_call() == parse('2017-11-18 13:33:10')
+
+    def test_compacting(self) -> None:
+        task = self.__task('* * * * * */5', '2017-11-18 13:33:05')
+        removed_task = self.__task('* * * * * */3', '2017-11-18 13:33:03')
+        state = StateFile(self.__filename)
+        state.save([removed_task])
+        for second in range(1200):
+            task.update_last_call(parse('2017-11-18 14:00:00').replace(minute=second // 60, second=second % 60))
+            state.save([task])
+        state.compact([task])
+        assert len(self.__read_lines()) == 1
+
+        restored = self.__task('* * * * * */5', '2017-11-18 00:00:00')
+        StateFile(self.__filename).restore(restored)
+        assert restored.last_call() == parse('2017-11-18 14:19:59')
+
+    def test_ignoring_broken_records(self) -> None:
+        with open(self.__filename, 'w') as file:
+            file.write('1510998785 0123456789abcdef\n15109987')
+        StateFile(self.__filename).save([self.__task('* * * * * */5', '2017-11-18 13:33:05')])
+
+        restored = self.__task('* * * * * */5', '2017-11-18 00:00:00')
+        StateFile(self.__filename).restore(restored)
+        assert restored.last_call() == parse('2017-11-18 13:33:05')
+
+    def __read_lines(self) -> list[str]:
+        with open(self.__filename, 'r') as file:
+            return file.readlines()
+
+    def __task(self, schedule: str, last_call: str) -> Task:
+        return Task.from_string(schedule + ' ' + self.__command + ' #' + last_call, Clock())
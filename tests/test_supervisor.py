@@ -0,0 +1,52 @@
+from __future__ import annotations
+import select
+import subprocess
+import time
+import unittest
+
+from cronus import Supervisor
+
+
+class TestSupervisor(unittest.TestCase):
+    def test_reaping(self) -> None:
+        supervisor = Supervisor()
+        exited = []
+        process = self.__spawn('sleep 0.1')
+        supervisor.watch(process, lambda: exited.append(process))
+        supervisor.reap()
+        assert exited == []
+        if supervisor.fds():
+            assert select.select(supervisor.fds(), [], [], 1.)[0]
+        else:
+            time.sleep(supervisor.polling_seconds() + 0.1)
+        supervisor.reap()
+        assert exited == [process]
+        assert process.returncode == 0
+
+    def test_terminating_without_waiting(self) -> None:
+        supervisor = Supervisor()
+        process = self.__spawn('sleep 5 & sleep 5')
+        supervisor.watch(process, self.fail)
+        started = time.monotonic()
+        supervisor.terminate(process)
+        assert time.monotonic() - started < 0.1
+        assert supervisor.polling_seconds() > 4
+        supervisor.reap()
+
+    def test_killing_group(self) -> None:
+        supervisor = Supervisor()
+        supervisor.kill_after_seconds = 0.2
+        process = self.__spawn('trap "" TERM; sleep 5 & sleep 5')
+        time.sleep(0.1)  # for the trap to be set
+        supervisor.terminate(process)
+        time.sleep(0.1)
+        supervisor.reap()
+        assert process.poll() is None
+        time.sleep(supervisor.polling_seconds())
+        supervisor.reap()
+        assert process.returncode == -9
+        assert supervisor.polling_seconds() is None
+
+    @staticmethod
+    def __spawn(command: str) -> subprocess.Popen:
+        return subprocess.Popen(command, shell=True, start_new_session=True)
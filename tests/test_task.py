@@ -1,13 +1,15 @@
 from __future__ import annotations
 from unittest_data_provider import data_provider
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, MAXYEAR, MINYEAR
 from dateutil.parser import parse
-from typing import Generator, Optional
+from itertools import islice
+from typing import Callable, Generator, Iterable, Iterator, Optional
 # from freezegun import freeze_time
+import calendar
 import time
 import unittest
 
-from cronus import Task, Clock
+from cronus import Executor, Field, Task, Clock, month_calendar, split_command, weekday_days
 
 
 class MockClock(Clock):
@@ -25,7 +27,8 @@ class TestTask(unittest.TestCase):
                         __command + ' "a"',
                         __command + " 'b'",
                         __command + ' "#c"',
-                        __command + ' \'#d \' "#e " \'# f\' "# g"')
+                        __command + ' \'#d \' "#e " \'# f\' "# g"',
+                        __command + ' " #1"')
 
     def correct_strings(self) -> Generator[str]:
         correct_beginnings = correct_delimiters = (
@@ -113,7 +116,8 @@ class TestTask(unittest.TestCase):
                         ('1-3 1-3 1-3 0 0 0', '2017-11-19',       '2017-03-01'),
                         ('1-2 1-2 1-2 0 0 0', '2017-11-19',       '2017-01-02'),
                         ('1,2 1,2 1,2 0 0 0', '2017-11-19',       '2017-01-02'),
-                        ('1 1 1 0 0 0',       '2017-11-19',       '2007-01-01'))
+                        ('1 1 1 0 0 0',       '2017-11-19',       '2007-01-01'),
+                        ('2 29 1 0 0 0',      '2043-11-19',       '2016-02-29'))
 
     calls_provider = [
         ('* * * 22 30 00', None, '2017-11-16', '2017-11-17', {0: '2017-11-16 22:30'}),
@@ -155,6 +159,14 @@ class TestTask(unittest.TestCase):
          {0: '2019-04-12 03:23:01', 58: '2019-04-12 03:23:59'}),
     ]
 
+    def calls_reference_provider(self) -> Generator[tuple[str, datetime]]:
+        for schedule in dict.fromkeys(' '.join(string.split()[:6]) for string in self.correct_strings()):
+            for _from in ('2017-11-16 23:59:59.5',
+                          '2019-12-31 23:58:00',
+                          '2020-02-28 23:59:30',
+                          '2018-03-31 12:00:00'):
+                yield schedule, parse(_from)
+
     def to_string_provider(self) -> Generator[tuple[str, datetime, bool, str]]:
         _time = '* * * * * * '
         for command in self.correct_commands:
@@ -176,6 +188,30 @@ class TestTask(unittest.TestCase):
                        execute,
                        _time + command + expected)
 
+    def split_commands_provider(self) -> list[tuple[str, Optional[list[str]]]]:
+        return [
+            ('echo 1', ['echo', '1']),
+            ('notify-send \'a b\' "c d" --urgency=low', ['notify-send', 'a b', 'c d', '--urgency=low']),
+            ('echo 1 >> out', None),
+            ('echo "$HOME"', None),
+            ('ls *.py', None),
+            ('cd /tmp', None),
+            ('A=1 env', None),
+            ('echo "a', None),
+            ('cp /etc/hosts /tmp/hosts{,.bak}', None),
+            ('echo {a,b}', None),
+            ('time backup', None),
+        ]
+
+    def annotations_provider(self) -> list[tuple[str, int, Optional[float]]]:
+        return [
+            ('echo 1', 0, None),
+            ('echo 1 # report @priority=2 @max-delay=60', 2, 60.),
+            ('echo 1 #@priority=-1 #1510869599', -1, None),
+            ('echo 1 # report@priority=1', 0, None),
+            ('echo "@priority=1"', 0, None),
+        ]
+
     @data_provider(correct_strings)
     def test_creating_from_correct_string(self, string: str) -> None:
         assert Task.from_string(string, Clock()) is not None
@@ -197,22 +233,67 @@ class TestTask(unittest.TestCase):
             .__task(task, True, expected_last_call - timedelta(microseconds=1), now)\
             .skipped() is True
         assert self.__task(task, True, expected_last_call, now).skipped() is False
+        assert self.__task(task, True, expected_last_call - timedelta(days=1), now).missed_call() == expected_last_call
 
     @data_provider(calls_provider)
     def test_calls(self, task: str, last_call: str, _from: str, _to: str, expected_calls: dict) -> None:
         if not last_call:
             last_call = '2000-01-01 00:00:00'
         task = Task.from_string(task + ' ' + self.__command + '  #' + last_call, Clock())
-        calls = task.calls(parse(_from), parse(_to))
+        calls = list(task.calls(parse(_from), parse(_to)))
         assert len(calls) == (max(expected_calls.keys()) + 1 if expected_calls else 0)
         for i, v in expected_calls.items():
             assert calls[i] == parse(v)
 
+    @data_provider(calls_reference_provider)
+    def test_next_and_prev_calls_match_enumeration(self, schedule: str, _from: datetime) -> None:
+        task = Task.from_string(schedule + ' ' + self.__command + ' #2000-01-01 00:00:00', Clock())
+        reference = ReferenceSchedule(schedule)
+        assert list(islice(task.calls(_from), 200)) == list(islice(reference.calls(_from), 200))
+        prev_calls = []
+        before = _from
+        while len(prev_calls) < 50 and (before := task.prev_call(before)):
+            prev_calls.append(before)
+        assert prev_calls == list(islice(reference.prev_calls(_from), 50))
+
+    def test_sharing_fields(self) -> None:
+        hits = Field.from_string.cache_info().hits
+        assert Field.from_string('*/5', 0, 59) is Field.from_string('*/5', 0, 59)
+        assert Field.from_string('*/5', 0, 59) is not Field.from_string('*/5', 0, 23)
+        assert Field.from_string.cache_info().hits >= hits + 2
+
+    def test_month_calendar(self) -> None:
+        assert month_calendar(2024)[2] == (29, 4)  # thursday
+        assert month_calendar(2023)[2] == (28, 3)
+        fridays = weekday_days(1 << 5, month_calendar(2024)[9][1], 30)
+        assert [day for day in range(32) if fridays >> day & 1] == [6, 13, 20, 27]
+
+    @data_provider(split_commands_provider)
+    def test_splitting_command(self, command: str, expected: Optional[list[str]]) -> None:
+        assert split_command(command) == expected
+
+    @data_provider(annotations_provider)
+    def test_annotations(self, command: str, priority: int, max_delay_seconds: Optional[float]) -> None:
+        task = Task.from_string('* * * * * * ' + command, Clock())
+        assert task.priority() == priority
+        assert task.max_delay_seconds() == max_delay_seconds
+
+    def test_spawning_without_shell(self) -> None:
+        process = Task.from_string('* * * * * * true', Clock()).spawn()
+        assert process.args == ['true']
+        assert process.wait() == 0
+        process = Task.from_string('* * * * * * no-such-command-of-cronus 2> /dev/null', Clock()).spawn()
+        assert isinstance(process.args, str)
+        assert process.wait() == 127
+        process = Task.from_string('* * * * * * no-such-command-of-cronus', Clock()).spawn()
+        assert isinstance(process.args, str)  # left to the shell
+        process.wait()
+
     @data_provider(to_string_provider)
     def test_converting_to_string(self, original: str, _datetime: datetime, execute: bool, expected: str) -> None:
         task = Task.from_string(original, MockClock(_datetime))
         if execute:
-            task.execute()
+            Executor().submit(task)
             time.sleep(0.05)
         assert str(task) == expected
 
@@ -229,3 +310,70 @@ class TestTask(unittest.TestCase):
         task = Task.from_string(string, MockClock(now) if now else Clock())
         self.assertIsNotNone(task)
         return task
+
+
+class ReferenceSchedule:
+    """
+    Straightforward enumeration of scheduled times, slow but obviously correct
+    """
+
+    def __init__(self, schedule: str) -> None:
+        months, days, weekdays, hours, minutes, seconds = schedule.split()
+        self.__months = self.__values(months, 1, 12)
+        self.__days = self.__values(days, 1, 31)
+        self.__weekdays = [weekday % 7 for weekday in self.__values(weekdays, 1, 7)]
+        self.__hours = self.__values(hours, 0, 23)
+        self.__minutes = self.__values(minutes, 0, 59)
+        self.__seconds = self.__values(seconds, 0, 59)
+
+    def calls(self, _from: datetime) -> Iterator[datetime]:
+        for year in range(_from.year, MAXYEAR + 1):
+            for _time in self.__year(year, False, lambda start, length: start + length > _from):
+                if _time >= _from:
+                    yield _time
+
+    def prev_calls(self, before: datetime) -> Iterator[datetime]:
+        for year in range(before.year, MINYEAR - 1, -1):
+            for _time in self.__year(year, True, lambda start, length: start < before):
+                if _time < before:
+                    yield _time
+
+    def __year(self,
+               year: int,
+               backwards: bool,
+               overlaps: Callable[[datetime, timedelta], bool]) -> Iterator[datetime]:
+        def ordered(values: list[int]) -> Iterable[int]:
+            return reversed(values) if backwards else values
+
+        for month in ordered(self.__months):
+            days_in_month = calendar.monthrange(year, month)[1]
+            if not overlaps(datetime(year, month, 1), timedelta(days=days_in_month)):
+                continue
+            for day in ordered(self.__days):
+                if day > days_in_month or int(datetime(year, month, day).strftime('%w')) not in self.__weekdays:
+                    continue
+                if not overlaps(datetime(year, month, day), timedelta(days=1)):
+                    continue
+                for hour in ordered(self.__hours):
+                    if not overlaps(datetime(year, month, day, hour), timedelta(hours=1)):
+                        continue
+                    for minute in ordered(self.__minutes):
+                        if not overlaps(datetime(year, month, day, hour, minute), timedelta(minutes=1)):
+                            continue
+                        for second in ordered(self.__seconds):
+                            yield datetime(year, month, day, hour, minute, second)
+
+    @staticmethod
+    def __values(value: str, _min: int, _max: int) -> list[int]:
+        values = set()
+        for value in value.split(','):
+            if value == '*':
+                values.update(range(_min, _max + 1))
+            elif value.startswith('*/'):
+                values.update(v for v in range(_min, _max + 1) if v % int(value[2:]) == 0)
+            elif '-' in value:
+                start, end = value.split('-')
+                values.update(range(int(start), int(end) + 1))
+            else:
+                values.add(int(value))
+        return sorted(values)
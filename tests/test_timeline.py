@@ -0,0 +1,85 @@
+from __future__ import annotations
+from collections import Counter
+from datetime import datetime, timedelta
+import io
+import os
+import tempfile
+import unittest
+
+from unittest_data_provider import data_provider
+
+from cronus import Clock, Task, Timeline, forecast
+
+lines = ('* * * * 0 0  echo hourly',
+         '* * * * 0 0  echo hourly too',
+         '* * 7 12 0 0  backup --weekly',
+         '* 1,15 * 3 */20 30  report',
+         '* * 1-5 9-17 */15 0  check',
+         '2 29 * 0 0 0  leap')
+
+
+class TestTimeline(unittest.TestCase):
+    def setUp(self) -> None:
+        clock = Clock()
+        self.__tasks = [task for line in lines if (task := Task.from_string(line, clock))]
+        self.__timeline = Timeline(self.__tasks)
+
+    @staticmethod
+    def ranges_provider() -> list[tuple[datetime, datetime]]:
+        return [
+            (datetime(2021, 1, 1), datetime(2021, 1, 8)),
+            (datetime(2021, 1, 1, 9, 15), datetime(2021, 1, 1, 9, 15)),
+            (datetime(2021, 1, 1, 9, 14, 59, 500), datetime(2021, 1, 1, 9, 15, 0, 1)),
+            (datetime(2021, 3, 14, 12, 0, 1), datetime(2021, 3, 16, 3, 20, 30)),
+            (datetime(2024, 2, 27, 23, 59, 59), datetime(2024, 3, 2)),
+        ]
+
+    @data_provider(ranges_provider)
+    def test_calls(self, _from: datetime, _to: datetime) -> None:
+        events = list(self.__timeline.calls(_from, _to))
+        assert [(event.datetime, set(event.tasks)) for event in events] == self.__events(_from, _to)
+
+    @data_provider(ranges_provider)
+    def test_counting(self, _from: datetime, _to: datetime) -> None:
+        assert self.__timeline.count(_from, _to) == sum(len(tasks) for _, tasks in self.__events(_from, _to))
+
+    @data_provider(ranges_provider)
+    def test_busiest(self, _from: datetime, _to: datetime) -> None:
+        calls = Counter({_time: len(tasks) for _time, tasks in self.__events(_from, _to)})
+        expected = sorted(calls.items(), key=lambda call: (-call[1], call[0]))[:5]
+        assert self.__timeline.busiest(_from, _to, 5) == expected
+
+    def test_year(self) -> None:
+        _from = datetime(2021, 1, 1)
+        assert self.__timeline.count(_from, datetime(2022, 1, 1)) == \
+               sum(len(event.tasks) for event in self.__timeline.calls(_from, datetime(2022, 1, 1)))
+        assert self.__timeline.busiest(_from, datetime(2022, 1, 1), 1) == [(datetime(2021, 1, 1, 9), 3)]
+
+    def test_forecast(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            crontab = os.path.join(directory, 'crontab')
+            with open(crontab, 'w') as file:
+                file.write('\n'.join(lines[:3]) + '\n')
+            output = io.StringIO()
+            forecast(crontab, datetime(2021, 1, 3, 11), datetime(2021, 1, 3, 13), output=output)
+            assert output.getvalue().splitlines() == ['2021-01-03 11:00:00 * * * * 0 0  echo hourly',
+                                                      '2021-01-03 11:00:00 * * * * 0 0  echo hourly too',
+                                                      '2021-01-03 12:00:00 * * * * 0 0  echo hourly',
+                                                      '2021-01-03 12:00:00 * * * * 0 0  echo hourly too',
+                                                      '2021-01-03 12:00:00 * * 7 12 0 0  backup --weekly']
+            output = io.StringIO()
+            forecast(crontab, datetime(2021, 1, 3), datetime(2021, 1, 4), count=True, output=output)
+            assert output.getvalue() == '49\n'
+            output = io.StringIO()
+            forecast(crontab, datetime(2021, 1, 3), datetime(2021, 1, 4), busiest=1, output=output)
+            assert output.getvalue() == '2021-01-03 12:00:00 3\n'
+
+    def __events(self, _from: datetime, _to: datetime) -> list[tuple[datetime, set[Task]]]:
+        """by enumerating calls of every task"""
+        calls: dict[datetime, set[Task]] = {}
+        for task in self.__tasks:
+            _call = task.next_call(_from - timedelta(microseconds=1))
+            while _call is not None and _call < _to:
+                calls.setdefault(_call, set()).add(task)
+                _call = task.next_call(_call)
+        return sorted(calls.items(), key=lambda call: call[0])